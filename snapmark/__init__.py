@@ -24,6 +24,7 @@ Basic Usage:
 from .operations.basic_operations import (
     Operation,
     AddMark,
+    AddMarks,
     SubstituteCircle,
     AddX,
     RemoveCircle,
@@ -68,6 +69,9 @@ from .core import IterationManager, iteration_manager  # iteration_manager = ali
 
 # ========== UTILITIES ==========
 from .utils.backup_manager import BackupManager
+from .utils.backup_store import BackupStore
+from .utils.placement_cache import PlacementCache
+from .mark_algorithm.stats import PlacementStats
 from .utils.helpers import (
     count_holes,
     find_all_circles,
@@ -77,6 +81,7 @@ from .utils.helpers import (
 # ========== CHECKING/SEARCH ==========
 from .checking.checking import (
     find_spec_holes,
+    find_cutouts,
     find_circle_centers,
     find_longer_entity,
     print_layers as print_document_layers,
@@ -104,6 +109,7 @@ __all__ = [
     # Operations
     'Operation',
     'AddMark',
+    'AddMarks',
     'AddCircle',
     'SubstituteCircle',
     'AddX',
@@ -121,6 +127,9 @@ __all__ = [
     
     # Utils
     'BackupManager',
+    'BackupStore',
+    'PlacementCache',
+    'PlacementStats',
     'count_holes',
     'mult_campana',
     'find_all_circles',
@@ -128,6 +137,7 @@ __all__ = [
     
     # Checking
     'find_spec_holes',
+    'find_cutouts',
     'find_circle_centers',
     'find_longer_entity',
     'print_document_layers',
@@ -2,6 +2,7 @@ import sys
 import os
 import ezdxf
 from snapmark.mark_algorithm.mark_algorithm import *
+from snapmark.mark_algorithm.topology import ContourTopology
 from snapmark.entities.add_entities import *
 
 
@@ -37,6 +38,30 @@ def find_spec_holes(doc, diametro_minimo=0, diametro_massimo=float('inf')):
         
     return holes
 
+def find_cutouts(doc, excluded_layers=None, min_area=0, max_area=float('inf'), region=None):
+    """
+    Searches for the inner cutouts of a document (holes of any shape, not only circles).
+    
+    Args:
+        doc: The document containing the entities to search.
+        excluded_layers: list of layers to skip entirely.
+        min_area: Minimum area of the cutouts to find (default: 0).
+        max_area: Maximum area of the cutouts to find (default: infinity).
+        region: Optional (x_min, y_min, x_max, y_max) rectangle, only the cutouts
+            whose bounding box overlaps it are checked.
+    
+    Returns:
+        A list of Contour objects (closed loops nested inside an outer profile).
+    """
+    # Imported here: mark_algorithm imports this module through utils.helpers
+    from snapmark.mark_algorithm.mark_algorithm import comp_segs_and_limits
+
+    segs = comp_segs_and_limits(doc.modelspace(), excluded_layers)[0]
+    topology = ContourTopology(segs)
+    loops = topology.candidates(*region) if region is not None else topology.contours
+
+    return [loop for loop in loops if loop.is_inner and min_area <= abs(loop.area) <= max_area]
+
 # # Cerca fori specifici
 # def find_spec_holes(doc, diametro_minimo=0, diametro_massimo=float('inf')):
 #     holes = []  # Lista per memorizzare le entità circolari
@@ -4,9 +4,13 @@ core.py - Core components of SnapMark.
 Contains IterationManager for multiple batch operations.
 """
 import os
-import ezdxf
-from pathlib import Path
-from snapmark.utils.helpers import find_dxf_files
+from collections import deque
+from concurrent.futures import Future
+from snapmark.utils.helpers import iter_dxf_files
+from snapmark.utils.parallel import ManagerJob, run_in_pool, merge_result, resolve_workers
+from snapmark.utils.prefetch import prefetch_documents, WriteBehindSaver
+from snapmark.utils.dxf_io import read_dxf, save_atomic, discard_output
+from snapmark.utils.manifest import Manifest, MANIFEST_NAME, fingerprint
 
 try:
     from .utils.backup_manager import BackupManager
@@ -45,37 +49,91 @@ class IterationManager:
         for op in operations:
             self.operation_list.append(op)
     
-    def execute(self, file_pattern="*.dxf", recursive=False):
+    def execute(self, file_pattern="*.dxf", recursive=False, workers=None, backend='process', prefetch=0,
+                incremental=False, manifest=None, min_size=None, max_size=None, exclude=None):
         """
         Executes all operations on the files in the specified folder.
         
         Args:
-            file_pattern (str): Pattern to filter files (e.g., "F*.dxf").
+            file_pattern (str): Glob (e.g., "F*.dxf") or compiled regex the file names must match.
             recursive (bool): If True, includes subfolders.
+            workers (int, optional): Number of worker processes the files are spread across
+                (None or 1: one file at a time in this process, 0: one per CPU core).
+                Counter totals and per-file stats are merged back in file order.
+            backend (str): Pool of the workers, 'process' (default, operations must be picklable)
+                or 'thread'.
+            prefetch (int): Queue depth of the I/O stages when files are processed in this process:
+                up to prefetch documents are read ahead on background threads and up to prefetch
+                saves are left to a writer thread while the next file runs (0: off).
+            incremental (bool): If True, skips the files left unchanged since the last successful run
+                with the same operations and parameters (see Manifest); Counter totals of the skipped
+                files are added back from the manifest.
+            manifest (str, optional): JSON file of the incremental runs
+                (default: .snapmark-manifest.json in the folder).
+            min_size (int, optional): Skips files smaller than this many bytes.
+            max_size (int, optional): Skips files larger than this many bytes.
+            exclude (str or list, optional): Globs or regexes of files and subfolders to skip.
+
+        Files are processed while the folder is walked (see iter_dxf_files); with workers the
+        whole listing is collected first.
         
         Returns:
-            dict: Statistics containing {'processed': int, 'modified': int, 'errors': list}.
+            dict: Statistics containing {'processed': int, 'modified': int, 'errors': list, 'skipped': int,
+                'placement': {file_path: [PlacementStats.as_dict(), ...]}} (one entry per placed sequence).
         """
         if not self.operation_list:
             print("⚠ No operations added")
-            return {'processed': 0, 'modified': 0, 'errors': []}
+            return {'processed': 0, 'modified': 0, 'errors': [], 'skipped': 0, 'placement': {}}
         
-        dxf_files = find_dxf_files(self.folder_path, recursive)
-
         if self.use_backup_system:
             print("🔧 Backup mode active")
         
         # Process files
-        stats = {'processed': 0, 'modified': 0, 'errors': []}
-        
-        for file_path in dxf_files:
-            success = self._process_single_file(str(file_path))
-            
-            if success:
-                stats['processed'] += 1
-                stats['modified'] += 1
-            else:
-                stats['errors'].append(str(file_path))
+        stats = {'processed': 0, 'modified': 0, 'errors': [], 'skipped': 0, 'placement': {}}
+        dxf_files = iter_dxf_files(self.folder_path, file_pattern, recursive, min_size, max_size, exclude)
+        file_paths = (str(file_path) for file_path in dxf_files)
+
+        # Incremental mode: unchanged files are skipped, their share of the totals is replayed
+        file_totals = None
+        if incremental:
+            folder = self.folder_path if os.path.isdir(self.folder_path) else os.path.dirname(self.folder_path)
+            manifest = Manifest(manifest or os.path.join(folder, MANIFEST_NAME), folder)
+            pipeline = fingerprint((self.operation_list, self.use_backup_system))
+            file_totals = {}
+            file_paths = self._skip_unchanged(file_paths, manifest, pipeline, stats)
+
+        workers = resolve_workers(workers)
+        if workers > 1:
+            # A pool splits a known list of files
+            file_paths = list(file_paths)
+            workers = min(workers, len(file_paths))
+            if file_paths:
+                print(f"🔧 Found {len(file_paths)} file(s) to process in {self.folder_path}")
+
+        if workers > 1:
+            results = self._process_in_pool(file_paths, workers, backend, stats['placement'], file_totals)
+        elif prefetch > 0:
+            results = self._process_with_prefetch(file_paths, prefetch, stats['placement'], file_totals)
+        else:
+            results = ((file_path, self._process_single_file(file_path, stats['placement'], totals=file_totals))
+                       for file_path in file_paths)
+
+        try:
+            for file_path, success in results:
+                if success:
+                    stats['processed'] += 1
+                    stats['modified'] += 1
+                else:
+                    stats['errors'].append(file_path)
+                if file_totals is not None:
+                    # A file left as it was (None) counts as done; failed files are retried next time
+                    if success is False:
+                        manifest.forget(file_path)
+                    else:
+                        manifest.record(file_path, pipeline, file_totals.pop(file_path, None))
+        finally:
+            if file_totals is not None:
+                manifest.save()
 
         # Final messages
         self._final_messages()
@@ -83,23 +141,74 @@ class IterationManager:
         # Report
         print(f"\n✓ Processed: {stats['processed']}")
         print(f"✓ Modified: {stats['modified']}")
+        if stats['skipped']:
+            print(f"⏭ Skipped (unchanged): {stats['skipped']}")
         if stats['errors']:
             print(f"❌ Errors: {len(stats['errors'])}")
         
         return stats
     
-    def _process_single_file(self, file_path: str):
+    def _process_in_pool(self, file_paths, workers, backend, placement_stats, file_totals=None):
+        """
+        Processes the files with a pool of workers, yielding (file_path, success) in file order.
+
+        Messages printed by a worker are replayed here file by file, and the worker copies of
+        the operations are merged into the operations of this manager (e.g. Counter totals).
+        """
+        print(f"🔧 Processing with {workers} {backend} workers")
+        for result in run_in_pool(ManagerJob(self), file_paths, workers, backend):
+            merge_result(self.operation_list, result)
+            if result.placement:
+                placement_stats[result.file_path] = result.placement
+            if file_totals is not None:
+                # Worker copies start from zero: their totals are the share of this file
+                file_totals[result.file_path] = [part.running_total() for part in result.parts]
+            yield result.file_path, result.success
+
+    def _process_with_prefetch(self, file_paths, depth, placement_stats, file_totals=None):
+        """
+        Processes the files in this process with read-ahead and write-behind, yielding
+        (file_path, success) in file order as soon as each save is done.
+        """
+        pending = deque()
+
+        def finished():
+            while pending and (not isinstance(pending[0][1], Future) or pending[0][1].done()):
+                file_path, result = pending.popleft()
+                yield file_path, result.result() if isinstance(result, Future) else result
+
+        with WriteBehindSaver(depth) as saver:
+            for file_path, document in prefetch_documents(file_paths, depth, self._read_original):
+                result = self._process_single_file(file_path, placement_stats, document.result, saver, file_totals)
+                pending.append((file_path, result))
+                yield from finished()
+        yield from finished()
+
+    def _process_single_file(self, file_path: str, placement_stats=None, load=None, saver=None, totals=None):
         """
         Applies operations to a single file.
         Catches ALL errors and prints ONE clear message.
+
+        Args:
+            file_path: Full path of the DXF file.
+            placement_stats (dict, optional): Collects the placement counters of the file under file_path.
+            load (callable, optional): Returns the document (e.g. already read ahead); default reads file_path.
+            saver (WriteBehindSaver, optional): Saves the document in the background; a Future of
+                the result is returned instead of the result.
+            totals (dict, optional): Collects the share of the running totals of the file under file_path.
+
+        Returns:
+            True if saved, None if the operations left the file as it was, False on error
+            (or a Future of it, with saver).
         """
         file_name = os.path.basename(file_path)
         folder = os.path.dirname(file_path)
         
-        # --- BACKUP ---
+        # --- BACKUP --- (on re-runs the original is parsed straight from the backup)
+        source = file_path
         if self.use_backup_system:
             try:
-                BackupManager.ensure_original(file_path)
+                source = BackupManager.ensure_backup(file_path)
             except PermissionError:
                 print(f"🔒 The file '{file_name}' is currently open in another application. Please close it and try again.")
                 return False
@@ -109,7 +218,7 @@ class IterationManager:
 
         # --- OPEN FILE ---
         try:
-            doc = ezdxf.readfile(file_path)
+            doc = load() if load is not None else read_dxf(source, file_path)
         except PermissionError:
             print(f"🔒 The file '{file_name}' is currently open in another application. Please close it and try again.")
             return False
@@ -119,29 +228,79 @@ class IterationManager:
 
         # --- APPLY OPERATIONS ---
         should_save = False
+        totals_before = [operation.running_total() for operation in self.operation_list]
         for operation in self.operation_list:
             try:
                 result = operation.execute(doc, folder, file_name)
                 should_save = should_save or result
                 operation.message(file_name)
+                if placement_stats is not None:
+                    self._collect_placement_stats(operation, file_path, placement_stats)
             except Exception as e:
                 print(f"❌ Error processing '{file_name}': {str(e)}")
+                discard_output(file_path, source)
                 return False
 
+        if totals is not None:
+            totals[file_path] = [None if before is None else operation.running_total() - before
+                                 for operation, before in zip(self.operation_list, totals_before)]
+
         # --- SAVE ---
         if should_save:
-            try:
-                doc.saveas(file_path)
-                return True
-            except PermissionError:
-                print(f"🔒 Cannot save '{file_name}' because it is open in another application.")
-                return False
-            except Exception as e:
-                print(f"❌ Cannot save '{file_name}': {str(e)}")
-                return False
+            if saver is not None:
+                return saver.submit(self._save_document, doc, file_path, source)
+            return self._save_document(doc, file_path, source)
+
+        discard_output(file_path, source)
+        return None
+
+    def _read_original(self, file_path):
+        """Reads the original of a file: its backup if there is one (backup mode), else the file."""
+        source = file_path
+        if self.use_backup_system and BackupManager.has_backup(file_path):
+            source = BackupManager.get_backup_path(file_path)
+        return read_dxf(source, file_path)
 
-        return False
+    @staticmethod
+    def _save_document(doc, file_path, source=None):
+        """Replaces the file with the document in one atomic write, printing ONE clear message on failure."""
+        file_name = os.path.basename(file_path)
+        try:
+            save_atomic(doc, file_path)
+            return True
+        except PermissionError:
+            print(f"🔒 Cannot save '{file_name}' because it is open in another application.")
+            return False
+        except Exception as e:
+            print(f"❌ Cannot save '{file_name}': {str(e)}")
+            discard_output(file_path, source or file_path)
+            return False
     
+    def _skip_unchanged(self, file_paths, manifest, pipeline, stats):
+        """Yields the files that changed since the last run, replaying the totals of the others."""
+        for file_path in file_paths:
+            if manifest.is_unchanged(file_path, pipeline):
+                self._replay_totals(manifest.totals(file_path))
+                stats['skipped'] += 1
+            else:
+                yield file_path
+
+    def _replay_totals(self, totals):
+        """Adds the stored totals of a skipped file to the operations (e.g. Counter)."""
+        for operation, quantity in zip(self.operation_list, totals):
+            if quantity is not None:
+                operation.add_to_total(quantity)
+
+    @staticmethod
+    def _collect_placement_stats(operation, file_path, placement_stats):
+        """Adds the placement counters of an operation (AddMark, AddMarks) to the batch stats."""
+        op_stats = getattr(operation, 'placement_stats', None)
+        if op_stats is None:
+            return
+        if not isinstance(op_stats, list):
+            op_stats = [op_stats]
+        placement_stats.setdefault(file_path, []).extend(s.as_dict() for s in op_stats if s is not None)
+
     def _final_messages(self):
         """Prints final messages (e.g., from Counter)."""
         try:
@@ -1,12 +1,110 @@
-
+import numpy as np
+from ezdxf.entities import factory
+from ezdxf.math import Vec3
+
+
+# ========== BULK CREATION ==========
+
+def _attribs_template(dxftype, dxfattribs):
+    """Validates and casts the shared attributes once, by building one throwaway entity."""
+    template = factory.new(dxftype, dxfattribs=dxfattribs)
+    return [(key, value) for key, value in template.dxf.all_existing_dxf_attribs().items()
+            if key not in ('handle', 'owner')]
+
+
+def _new_entities(doc, dxftype, dxfattribs, count):
+    """
+    Creates count entities of doc sharing the same (already validated) attributes.
+    They are not yet in the entity database nor in a layout: see append_to_modelspace.
+    """
+    template = _attribs_template(dxftype, dxfattribs)
+    cls = factory.ENTITY_CLASSES[dxftype]
+    entities = []
+    for _ in range(count):
+        entity = cls()
+        entity.doc = doc
+        dxf = entity.dxf
+        for key, value in template:
+            dxf.unprotected_set(key, value)
+        entities.append(entity)
+    return entities
+
+
+def append_to_modelspace(doc, entities):
+    """Registers entities built by _new_entities (new handles, in order) and adds them to the model space."""
+    entitydb = doc.entitydb
+    msp = doc.modelspace()
+    for entity in entities:
+        entitydb.add(entity)
+        msp.add_entity(entity)
+    return entities
+
+
+def add_lines_bulk(doc, segs, layer='0'):
+    """
+    Adds many LINE entities at once.
+
+    Args:
+        doc: The document to modify.
+        segs: (N, 4) array of (start_x, start_y, end_x, end_y) rows.
+        layer: Layer of the new lines.
+
+    Returns:
+        list: The new LINE entities.
+    """
+    segs = np.asarray(segs, dtype=float).reshape(-1, 4)
+    entities = _new_entities(doc, 'LINE', {'layer': layer}, len(segs))
+    for entity, (x1, y1, x2, y2) in zip(entities, segs.tolist()):
+        entity.dxf.unprotected_set('start', Vec3(x1, y1, 0))
+        entity.dxf.unprotected_set('end', Vec3(x2, y2, 0))
+    return append_to_modelspace(doc, entities)
+
+
+def add_circles_bulk(doc, centers, radius, layer='0'):
+    """
+    Adds many CIRCLE entities at once.
+
+    Args:
+        doc: The document to modify.
+        centers: (N, 2) array of centers.
+        radius: Radius of every circle, or an (N,) array of radii.
+        layer: Layer of the new circles.
+
+    Returns:
+        list: The new CIRCLE entities.
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    radii = np.broadcast_to(np.asarray(radius, dtype=float), (len(centers),))
+    entities = _new_entities(doc, 'CIRCLE', {'layer': layer}, len(centers))
+    for entity, (x, y), r in zip(entities, centers.tolist(), radii.tolist()):
+        entity.dxf.unprotected_set('center', Vec3(x, y, 0))
+        entity.dxf.unprotected_set('radius', r)
+    return append_to_modelspace(doc, entities)
+
+
+def add_lwpolylines_bulk(doc, point_lists, layer='0'):
+    """
+    Adds many LWPOLYLINE entities at once.
+
+    Args:
+        doc: The document to modify.
+        point_lists: One (K, 2) array (or list of points) per polyline.
+        layer: Layer of the new polylines.
+
+    Returns:
+        list: The new LWPOLYLINE entities.
+    """
+    entities = _new_entities(doc, 'LWPOLYLINE', {'layer': layer}, len(point_lists))
+    for entity, points in zip(entities, point_lists):
+        entity.set_points(np.asarray(points, dtype=float).reshape(-1, 2).tolist(), format='xy')
+    return append_to_modelspace(doc, entities)
+
+
+# ========== ENTITIES ==========
 
 def add_circle(doc, hole_list, radius, layer='0'):
     """Adds circles at specified positions in the document."""
-    msp = doc.modelspace()  # Access the model space of the drawing
-    for center_x, center_y in hole_list:
-        center = (center_x, center_y)
-        # print(center_x, center_y)
-        msp.add_circle(center=center, radius=radius, dxfattribs={'layer': layer}) 
+    add_circles_bulk(doc, [(center_x, center_y) for center_x, center_y in hole_list], radius, layer)
 
 
 def add_circle_with_handle(doc, center_x, center_y, radius=10, layer='0', handle=68):
@@ -23,39 +121,40 @@ def add_circle_with_handle(doc, center_x, center_y, radius=10, layer='0', handle
 
 def add_x(doc, hole_list, x_size=8, layer='0'):
     """Adds an 'X' shape at specified positions in the document."""
-    msp = doc.modelspace()
-    for center_x, center_y in hole_list:
-        # Calculate the coordinates for the 'x'
-        x1 = center_x - (x_size / 1.4141) /2
-        y1 = center_y - (x_size / 1.4141) /2
-        x2 = center_x + (x_size / 1.4141) /2
-        y2 = center_y + (x_size / 1.4141) /2
-        
-        # Add diagonal lines to form an 'x'
-        msp.add_line(start=(x1, y1), end=(x2, y2), dxfattribs={'layer': layer})
-        msp.add_line(start=(x1, y2), end=(x2, y1), dxfattribs={'layer': layer})
-
-
-
-def add_numbers_to_layer(doc, sequence, layer = '0'):
-    """Adds a sequence of lines to a specified layer in the document."""
-    msp = doc.modelspace()
-   
-    for scaled_segments, position in sequence.sequence:        
-
-        # Add lines based on the segments at the scaled position
-        scaled_position = position  # The position has already been scaled
-        for i in range(len(scaled_segments) - 1):
-            start_point = (
-                scaled_segments[i][0] + scaled_position[0],
-                scaled_segments[i][1] + scaled_position[1]
-            )
-            end_point = (
-                scaled_segments[i + 1][0] + scaled_position[0],
-                scaled_segments[i + 1][1] + scaled_position[1]
-            )
-
-            msp.add_line(start=start_point, end=end_point, dxfattribs={'layer': layer})
+    centers = np.asarray([(center_x, center_y) for center_x, center_y in hole_list], dtype=float).reshape(-1, 2)
+    # Calculate the coordinates for the 'x'
+    x1 = centers[:, 0] - (x_size / 1.4141) /2
+    y1 = centers[:, 1] - (x_size / 1.4141) /2
+    x2 = centers[:, 0] + (x_size / 1.4141) /2
+    y2 = centers[:, 1] + (x_size / 1.4141) /2
+
+    # Diagonal lines forming each 'x', in the same order as before (both lines of a hole together)
+    segs = np.stack([np.column_stack((x1, y1, x2, y2)), np.column_stack((x1, y2, x2, y1))], axis=1)
+    add_lines_bulk(doc, segs.reshape(-1, 4), layer)
+
+
+
+def add_numbers_to_layer(doc, sequence, layer = '0', entity_type = 'LINE'):
+    """
+    Adds a sequence of glyph strokes to a specified layer in the document.
+
+    Args:
+        doc: The document to mark.
+        sequence: NS object with the scaled segments and position of each character.
+        layer: Layer of the new entities.
+        entity_type: 'LINE' (one LINE per stroke segment) or 'LWPOLYLINE' (one polyline per glyph).
+    """
+    entity_type = entity_type.upper()
+    if entity_type not in ('LINE', 'LWPOLYLINE'):
+        raise ValueError(f"Unknown mark entity type '{entity_type}'.")
+
+    # Strokes moved to their position in one vectorized offset per character
+    strokes = [np.asarray(scaled_segments, dtype=float).reshape(-1, 2) + np.asarray(position[:2], dtype=float)
+               for scaled_segments, position in sequence.sequence]
+    if entity_type == 'LWPOLYLINE':
+        add_lwpolylines_bulk(doc, strokes, layer)
+    elif strokes:
+        add_lines_bulk(doc, np.concatenate([np.hstack([points[:-1], points[1:]]) for points in strokes]), layer)
     
        
     
@@ -1,8 +1,19 @@
 import ezdxf
 import numpy as np
-from snapmark.utils.segments_dict import number_segments_dict
+from snapmark.utils.glyphs import TextLayout
 from snapmark.utils.helpers import is_excluded_layer
 from snapmark.utils.messages import dxf_3d_geometry_error
+from snapmark.utils.placement_cache import placement_key
+from snapmark.mark_algorithm.scanline import (
+    x_intercepts, SegmentIndex, MaterialIndex, InterceptCache, DEFAULT_CACHE_SIZE
+)
+from snapmark.mark_algorithm.raster import OccupancyGrid
+from snapmark.mark_algorithm.topology import DEFAULT_TOLERANCE, ContourTopology
+from snapmark.mark_algorithm.spatial import GridIndex
+from snapmark.mark_algorithm.stats import PlacementStats
+from snapmark.mark_algorithm.tessellation import (
+    SegmentBuffer, TESSELLATORS, tessellate_entity, MAX_CHORD_ERROR
+)
 
 
 # Classe per definire la sequenza di numeri
@@ -15,8 +26,13 @@ class NS:
 
 ######################################################################################################################
 # Costants
-        
-MIN_ARC_SEGS = 15
+# MIN_ARC_SEGS and MAX_CHORD_ERROR live in tessellation.py
+
+# Weights of the 'scored' placement between the spans where the text fits: closer to the center,
+# more room on the sides. The size is not weighed, it comes from the rescale search as for 'scanline'
+SCORE_WEIGHTS = {'center': 0.5, 'clearance': 0.25}
+# Max number of bisection steps of the rescale search (the height interval halves at each step)
+MAX_RESCALE_ITERATIONS = 32
 ######################################################################################################################
 # Support functions to pass in the main (deprecated)
 
@@ -39,22 +55,41 @@ def comp_sf(doc, scale_factor=50):
 #############################################################################################################################
 
 # Trovo tutti i punti di incrocio tra entità nel disegno e linee orizzontali con valore a crescere in y
-def find_x_intercept(y, segs):
+def find_x_intercept(y, segs, cache=None):
     """Finds x-intercepts for a given y value from a list of segments."""
-    if y in x_intercept_cache:
-        return x_intercept_cache[y]
-    else:
-        x_intercept = []
-        for (start_x, start_y, end_x, end_y) in segs:
-            if start_y >= y >= end_y or start_y <= y <= end_y:
-                if start_y != end_y:
-                    x = (y - start_y)/(end_y - start_y) * (end_x - start_x) + start_x
-                    x_intercept.append(x)
-                    
-        
-        x_intercept.sort()
-        x_intercept_cache[y] = x_intercept
-        return x_intercept
+    x_intercept = cache.get(y) if cache is not None else None
+    if x_intercept is None:
+        x_intercept = scan_x_intercepts([y], segs)[0]
+        if cache is not None:
+            cache[y] = x_intercept
+    return x_intercept
+
+
+def scan_x_intercepts(y_values, segs):
+    """Runs the scanline on a SegmentIndex when available, otherwise on the plain segment array."""
+    if isinstance(segs, (SegmentIndex, MaterialIndex)):
+        return segs.x_intercepts(y_values)
+    return x_intercepts(y_values, segs)
+
+
+def find_x_intercepts(y_values, segs, cache=None):
+    """
+    Finds the x-intercepts for a batch of y values with one vectorized scanline call.
+
+    Only the y values not already in the cache are computed.
+
+    Returns:
+        list: The sorted x-intercepts of each y, in the same order as y_values.
+    """
+    found = {y: (cache.get(y) if cache is not None else None) for y in dict.fromkeys(y_values)}
+    missing = [y for y, x_intercept in found.items() if x_intercept is None]
+    if missing:
+        computed = list(zip(missing, scan_x_intercepts(missing, segs)))
+        found.update(computed)
+        if cache is not None:
+            cache.update(computed)
+
+    return [found[y] for y in y_values]
     
 
 def find_intermediate_y(bottom_y, top_y, int_step=2):
@@ -68,23 +103,55 @@ def find_intermediate_y(bottom_y, top_y, int_step=2):
         
     return steps
 
+
+def find_candidate_y(min_y, max_y, height_sequence, start_y, step):
+    """
+    Lists the bottom y-coordinates to try for a sequence, in search order.
+
+    Rows go up from min_y + start_y in steps, then down from just below it; the
+    two extreme rows are appended last.
+    """
+    y = min_y + start_y
+    y_to_try = []
+    # Check valid y-coordinates while moving up in the file
+    if height_sequence + 1 <= max_y - min_y:
+        while y < max_y - 0.5 - height_sequence:
+            y_to_try.append(y)
+            y += step
+        # Check valid y-coordinates while moving down in the file  
+        y = min_y + start_y - step
+        while y > min_y + 0.5:
+            y_to_try.append(y)
+            y -= step
+    
+        if 0.5 not in y_to_try:
+            y_to_try.append(0.5)
+        if max_y - height_sequence - 0.5 not in y_to_try:    
+            y_to_try.append(max_y - height_sequence - 0.5)
+
+    return y_to_try
+
 #############################################################################################################################
 # LEVEL 2 - Supporting functions to main algorithm
 #############################################################################################################################
 
 
 # Trasforma ogni entità in lista di segmenti espressi in tuple.
-def comp_segs_and_limits(msp, excluded_layers=None):
+def comp_segs_and_limits(msp, excluded_layers=None, chord_error=MAX_CHORD_ERROR):
     """
     Converts entities in the model space to a list of line segments and their limits.
 
+    Every DXF type with a registered tessellator is converted (LINE, LWPOLYLINE with
+    bulges, CIRCLE, ARC, SPLINE, ELLIPSE; see tessellation.register_tessellator).
+
     Args:
         msp: The model space containing the entities to be processed.
         excluded_layers: list of layers to skip entirely.
+        chord_error: Max distance between a circle or arc and its chords (default is 0.1).
 
     Returns:
         A tuple containing:
-            - tot_segs: A list of segments represented as tuples (start_x, start_y, end_x, end_y).
+            - tot_segs: An (N, 4) float array of segments, one (start_x, start_y, end_x, end_y) row each.
             - min_x: The minimum x-coordinate among all segments.
             - min_y: The minimum y-coordinate among all segments.
             - max_x: The maximum x-coordinate among all segments.
@@ -100,108 +167,141 @@ def comp_segs_and_limits(msp, excluded_layers=None):
     def skip(entity):
         return is_excluded_layer(entity.dxf.layer, excluded_layers)
     
-    # Initializes lists for arcs and lines
-    round_segs = []
-    line_segs = []
-    is_2d = True
-    
-    # Finds the minimum and maximum coordinate values among all lines    
-    for entity in msp.query('LINE'):
+    # Every entity type with a registered tessellator writes into one shared buffer
+    buffer = SegmentBuffer()
+    for entity in msp.query(' '.join(TESSELLATORS)):
         if skip(entity):
             continue
-        start_point = entity.dxf.start
-        end_point = entity.dxf.end
-        line_segs.append((start_point.x, start_point.y, end_point.x, end_point.y))
-        if start_point.z != 0 or end_point.z != 0:
-            is_2d = False   
+        tessellate_entity(entity, buffer, chord_error)
 
-    for entity in msp.query('LWPOLYLINE'):
-        if skip(entity):
-            continue
-        verts = list(entity.vertices())
-        if len(verts) < 2:
-            continue
-
-        # Create consecutive segments
-        for i in range(len(verts) - 1):
-            x1, y1, *z1 = verts[i]
-            x2, y2, *z2 = verts[i + 1]
-            line_segs.append((x1, y1, x2, y2))
-            
-            # ✅ FIX: gestione corretta liste vuote
-            z1_val = z1[0] if len(z1) > 0 else 0
-            z2_val = z2[0] if len(z2) > 0 else 0
-            if z1_val != 0 or z2_val != 0:
-                is_2d = False
-
-        # if close, merge last with first
-        if entity.closed:
-            x1, y1, *z1 = verts[-1]
-            x2, y2, *z2 = verts[0]
-            line_segs.append((x1, y1, x2, y2))
-            
-            # ✅ FIX: gestione corretta liste vuote
-            z1_val = z1[0] if len(z1) > 0 else 0
-            z2_val = z2[0] if len(z2) > 0 else 0
-            if z1_val != 0 or z2_val != 0:
-                is_2d = False       
-
-
-    for entity in msp.query('CIRCLE ARC'):
-        if skip(entity):
-            continue
-
-        if entity.dxftype() == 'CIRCLE':
-            if entity.dxf.center.z != 0:
-                is_2d = False
-            center_x, center_y = entity.dxf.center.x, entity.dxf.center.y
-            rad = entity.dxf.radius
-            num_segment = MIN_ARC_SEGS + rad//2
-
-            ang = np.linspace(0, 2 * np.pi, int(num_segment) + 1)
-            x = center_x + rad * np.cos(ang)
-            y = center_y + rad * np.sin(ang)
-            coords = list(zip(x, y))
-            circ_segs = [(coords[i][0], coords[i][1], coords[i+1][0], coords[i+1][1]) for i in range(0, len(coords) - 2)]
-            circ_segs.append((coords[-1][0], coords[-1][1], coords[0][0], coords[0][1]))
-            round_segs.extend(circ_segs)
-
-        elif entity.dxftype() == 'ARC':
-            if entity.dxf.center.z != 0:
-                is_2d = False
-            center_x, center_y = entity.dxf.center.x, entity.dxf.center.y
-            rad = entity.dxf.radius
-            start_angle = np.radians(entity.dxf.start_angle)
-            final_angle = np.radians(entity.dxf.end_angle)
-            if start_angle > final_angle:
-                final_angle += 2 * np.pi
-            num_segment = MIN_ARC_SEGS + (rad//2) * ((final_angle - start_angle) / (2 * np.pi))
-
-            ang = np.linspace(start_angle, final_angle, int(num_segment) + 1)
-            x = center_x + rad * np.cos(ang)
-            y = center_y + rad * np.sin(ang)
-            coords = list(zip(x, y))
-            arc_segs = [(coords[i][0], coords[i][1], coords[i+1][0], coords[i+1][1]) for i in range(0, len(coords) - 2)]
-            round_segs.extend(arc_segs)
-
-            
-    tot_segs = round_segs + line_segs
+    tot_segs = buffer.to_array(chord_error)
+    is_2d = buffer.is_2d
     
     # Initializes the minimum and maximum coordinate values
     min_x = min_y = float('inf')
     max_x = max_y = float('-inf')
     
-    for (start_x, start_y, end_x, end_y) in tot_segs:        
-        min_x = min(min_x, start_x, end_x)
-        min_y = min(min_y, start_y, end_y)
-        max_x = max(max_x, start_x, end_x)
-        max_y = max(max_y, start_y, end_y)
+    if len(tot_segs) > 0:
+        min_x = float(tot_segs[:, [0, 2]].min())
+        min_y = float(tot_segs[:, [1, 3]].min())
+        max_x = float(tot_segs[:, [0, 2]].max())
+        max_y = float(tot_segs[:, [1, 3]].max())
 
     return tot_segs, min_x, min_y, max_x, max_y, is_2d
 
 
+class PlacementContext:
+    """
+    Geometry of one document, computed once and shared by the whole placement search.
+
+    Holds the tessellated segments, their extents, the 2D flag, the segment indexes
+    (y buckets for scanlines, uniform grid for rectangle queries) and the x-intercept
+    cache, so every rescale attempt of place_sequence reuses the same tessellation
+    instead of converting the drawing again.
 
-def find_space_between_interceptions(x_left, x_right, lenght_sequence, height_sequence, segs, margin, y):   
+    All placement state lives here (no module globals), so documents can be placed
+    concurrently from different threads.
+    """
+
+    def __init__(self, doc, excluded_layers=None, cache_size=DEFAULT_CACHE_SIZE, chord_error=MAX_CHORD_ERROR):
+        """
+        Tessellates the model space of the document and builds the segment index.
+
+        Args:
+            doc: The document containing the model space.
+            excluded_layers: list of layers to skip entirely.
+            cache_size (int): Max number of scanlines kept in the intercept cache (None for unbounded).
+            chord_error (float): Max distance between a circle or arc and its chords.
+        """
+        self.doc = doc
+        self.excluded_layers = excluded_layers
+        # Counters of the placement in progress (place_sequence sets a fresh one per call)
+        self.stats = PlacementStats()
+        with self.stats.phase('tessellation'):
+            (self.segs, self.min_x, self.min_y,
+             self.max_x, self.max_y, self.is_2d) = comp_segs_and_limits(doc.modelspace(), excluded_layers, chord_error)
+        with self.stats.phase('indexing'):
+            self.index = SegmentIndex(self.segs)
+            self.grid_index = GridIndex(self.segs)
+        self.intercept_cache = InterceptCache(cache_size)
+        self.grids = {}
+        self.rectangles = {}
+        self._topology = None
+        self._material_index = None
+
+    @property
+    def topology(self):
+        """Contour topology of the drawing (loops, outer profiles and cutouts), built on first use."""
+        if self._topology is None:
+            self._topology = ContourTopology(self.segs)
+        return self._topology
+
+    @property
+    def material_index(self):
+        """
+        Scanline index deciding the material by the even-odd rule (built on first use).
+
+        Open contours (e.g. marking lines) would flip the parity of every scanline crossing
+        them, so the parity comes from the closed loops and the open chains only split the
+        spans (see MaterialIndex). When every vertex has an even degree all the chains are
+        closed and the full index is reused without building the topology.
+        """
+        if self._material_index is None:
+            ends = np.round(self.segs.reshape(-1, 2) / DEFAULT_TOLERANCE).astype(np.int64)
+            _, degree = np.unique(ends, axis=0, return_counts=True)
+            if np.all(degree % 2 == 0):
+                self._material_index = self.index
+            else:
+                topology = self.topology
+                open_ids = [c.segment_ids for c in topology.open]
+                self._material_index = MaterialIndex(topology.closed_segments(), self.segs[np.concatenate(open_ids)])
+        return self._material_index
+
+    def x_intercept(self, y):
+        """Sorted x-intercepts of the horizontal line at y on the material contours (cached)."""
+        return find_x_intercept(y, self.material_index, self.intercept_cache)
+
+    def x_intercepts(self, y_values):
+        """Sorted x-intercepts of a batch of horizontal lines on the material contours (cached)."""
+        return find_x_intercepts(y_values, self.material_index, self.intercept_cache)
+
+    def occupancy_grid(self, resolution=None):
+        """Occupancy grid of the drawing at the given resolution (built on first use)."""
+        if resolution not in self.grids:
+            self.grids[resolution] = OccupancyGrid(self.index, self.min_x, self.min_y,
+                                                   self.max_x, self.max_y, resolution,
+                                                   material_index=self.material_index)
+        return self.grids[resolution]
+
+    def maximal_rectangles(self, resolution=None):
+        """Maximal empty rectangles of the occupancy grid (computed on first use)."""
+        if resolution not in self.rectangles:
+            self.rectangles[resolution] = self.occupancy_grid(resolution).maximal_rectangles()
+        return self.rectangles[resolution]
+
+    def add_obstacle(self, x_min, y_min, x_max, y_max):
+        """
+        Adds a rectangle (e.g. a label already placed) that the next searches must avoid.
+
+        The rectangle is added as a closed loop: inside the material it counts as a cutout
+        (even-odd rule), so every placement backend sees it. Indexes are rebuilt, occupancy
+        grids already built are blocked in place and the other derived caches dropped.
+        """
+        rect = np.array([[x_min, y_min, x_max, y_min], [x_max, y_min, x_max, y_max],
+                         [x_max, y_max, x_min, y_max], [x_min, y_max, x_min, y_min]], dtype=float)
+        self.segs = np.vstack((self.segs, rect))
+        self.index = SegmentIndex(self.segs)
+        self.grid_index = GridIndex(self.segs)
+        self.intercept_cache = InterceptCache(self.intercept_cache.maxsize)
+        for grid in self.grids.values():
+            grid.block(x_min, y_min, x_max, y_max)
+        self.rectangles = {}
+        self._topology = None
+        self._material_index = None
+
+
+
+def find_space_between_interceptions(x_left, x_right, lenght_sequence, height_sequence, segs, margin, y, cache=None):   
     """
     Checks if there is enough space between interceptions for a given sequence.
 
@@ -210,18 +310,22 @@ def find_space_between_interceptions(x_left, x_right, lenght_sequence, height_se
         x_right (float): The right boundary of the space to check.
         lenght_sequence (float): The length of the sequence to be placed.
         height_sequence (float): The height of the sequence to be placed.
-        segs (list): A list of segments to check for interceptions.
+        segs (GridIndex, SegmentIndex or ndarray): Segments to check for interceptions. With a
+            GridIndex the whole span rectangle is checked exactly with one grid query; otherwise
+            horizontal sub-rows are probed every 2 units.
         margin (float): The margin to be added to the sequence length.
         y (float): The y-coordinate to check for interceptions.
+        cache (InterceptCache, optional): Intercept cache of the placement context (default is no cache).
 
     Returns:
         bool: True if there is enough space for the sequence, False otherwise.
     """           
 
     if (lenght_sequence + 2*margin) <= (x_right - x_left):
+        if isinstance(segs, GridIndex):
+            return segs.rect_is_clear(x_left, y, x_right, y + height_sequence)
         y_ints = find_intermediate_y(y, y + height_sequence)
-        for y_int in y_ints:
-            x_intercept = find_x_intercept(y_int, segs)         
+        for x_intercept in find_x_intercepts(y_ints, segs, cache):
             for interception in x_intercept:
                 if x_right > interception > x_left:
                     return False
@@ -279,12 +383,68 @@ def find_shared_spaces(top_interceptions, bottom_interceptions):
 
     return shared_spaces 
           
+
+def row_spans(scanlines):
+    """
+    Filled spans of a batch of scanlines, as flat arrays.
+
+    Args:
+        scanlines (list): The sorted x-intercepts of each scanline (a trailing unpaired intercept is ignored).
+
+    Returns:
+        tuple: (rows, starts, ends) arrays, sorted by scanline and then by x.
+    """
+    lengths = np.array([len(x_intercept) for x_intercept in scanlines], dtype=np.intp)
+    x = np.fromiter((v for x_intercept in scanlines for v in x_intercept), dtype=float, count=int(lengths.sum()))
+    row = np.repeat(np.arange(len(scanlines)), lengths)
+    position = np.arange(len(x)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    first = np.flatnonzero((position % 2 == 0) & (position + 1 < lengths[row]))
+    return row[first], x[first], x[first + 1]
+
+
+def intersect_spans(top_rows, bottom_rows):
+    """
+    Vectorized intersection of the filled spans of the top and bottom scanline of every row.
+
+    Same spans as find_shared_spaces, row by row, for scanlines with an even number of
+    intercepts (a trailing unpaired intercept is ignored).
+
+    Args:
+        top_rows (list): The sorted x-intercepts of the top scanline of each row.
+        bottom_rows (list): The sorted x-intercepts of the bottom scanline of each row.
+
+    Returns:
+        tuple: (rows, lefts, rights) arrays of the shared spans, sorted by row and then by x.
+    """
+    top_row, top_start, top_end = row_spans(top_rows)
+    bottom_row, bottom_start, bottom_end = row_spans(bottom_rows)
+    if not len(top_row) or not len(bottom_row):
+        return top_row[:0], top_start[:0], top_end[:0]
+
+    # All the rows on one sorted axis: every row is shifted past the end of the previous one
+    low = min(top_start.min(), bottom_start.min())
+    stride = 2 * (max(top_end.max(), bottom_end.max()) - low) + 1
+
+    def key(row, x):
+        """Position of x of the given row on the shared axis."""
+        return row * stride + (x - low)
+
+    # Bottom spans [first, last) overlapping each top span
+    first = np.searchsorted(key(bottom_row, bottom_end), key(top_row, top_start), 'left')
+    last = np.searchsorted(key(bottom_row, bottom_start), key(top_row, top_end), 'right')
+    counts = np.maximum(last - first, 0)
+    top_ids = np.repeat(np.arange(len(top_start)), counts)
+    bottom_ids = np.repeat(first, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+
+    return (top_row[top_ids], np.maximum(top_start[top_ids], bottom_start[bottom_ids]),
+            np.minimum(top_end[top_ids], bottom_end[bottom_ids]))
+
 ##############################################################################
 # Level 1 -- Main algorithm functions 
 ###################################################################################################################
 
 # Main algorithm to find space for a sequence
-def find_space_for_sequence(lenght_sequence, height_sequence, doc, align, start_y, step, margin, excluded_layers):
+def find_space_for_sequence(lenght_sequence, height_sequence, doc, align, start_y, step, margin, excluded_layers, context=None):
     """
     Finds a valid space for placing a sequence of specified length and height within a drawing.
 
@@ -297,6 +457,7 @@ def find_space_for_sequence(lenght_sequence, height_sequence, doc, align, start_
         step (float): The step size for incrementing or decrementing the y-coordinate during the search.
         margin (float): The margin to be added around the sequence.
         excluded_layes: list of layers to skip for segment conversion.
+        context (PlacementContext, optional): Geometry shared across calls; built here if not given.
 
     Returns:
         tuple: A tuple containing:
@@ -311,47 +472,24 @@ def find_space_for_sequence(lenght_sequence, height_sequence, doc, align, start_
         placement coordinates for the sequence.
     """
 
-    global segments_cache
-
-    msp = doc.modelspace()
-
-    if segments_cache is not None:
-        segs, min_x, min_y, max_x, max_y, is_2d = segments_cache
-    else:
+    if context is None:
         # Filter entities from the specified layer    
-        segs, min_x, min_y, max_x, max_y, is_2d = comp_segs_and_limits(msp, excluded_layers)
+        context = PlacementContext(doc, excluded_layers)
     
-    # Filter entities from the specified layer    
-    segs, min_x, min_y, max_x, max_y, is_2d = comp_segs_and_limits(msp, excluded_layers)
-
-    y = min_y + start_y
     start_x = None
-    y_to_try = []
-    # Check valid y-coordinates while moving up in the file
-    if height_sequence + 1 <= max_y - min_y:
-        while y < max_y - 0.5 - height_sequence:
-            y_to_try.append(y)
-            y += step
-        # Check valid y-coordinates while moving down in the file  
-        y = min_y + start_y - step
-        while y > min_y + 0.5:
-            y_to_try.append(y)
-            y -= step
+    y_to_try = find_candidate_y(context.min_y, context.max_y, height_sequence, start_y, step)
     
-        if 0.5 not in y_to_try:
-            y_to_try.append(0.5)
-        if max_y - height_sequence - 0.5 not in y_to_try:    
-            y_to_try.append(max_y - height_sequence - 0.5)
+    # Compute bottom and top intercepts of every candidate row in one batch
+    context.x_intercepts(y_to_try + [y + height_sequence for y in y_to_try])
 
-    
-    
     # Iterate through the list to find a space for the sequence
     is_space = False
     for y in y_to_try:
-        x_intercept_bottom = find_x_intercept(y, segs)
+        context.stats.y_candidates += 1
+        x_intercept_bottom = context.x_intercept(y)
         
         if len(x_intercept_bottom) > 1: 
-            x_intercept_top = find_x_intercept(y + height_sequence, segs)
+            x_intercept_top = context.x_intercept(y + height_sequence)
             if len(x_intercept_top) > 1:
             
                 spaces_available_list = []
@@ -367,7 +505,7 @@ def find_space_for_sequence(lenght_sequence, height_sequence, doc, align, start_
                         
                     for spaces in shared_spaces_list:
         
-                        is_space = find_space_between_interceptions(spaces[0], spaces[1], lenght_sequence, height_sequence, segs, margin, y)
+                        is_space = find_space_between_interceptions(spaces[0], spaces[1], lenght_sequence, height_sequence, context.grid_index, margin, y, context.intercept_cache)
                         if is_space:
                             x_left, x_right = spaces[0], spaces[1]             
                             break
@@ -402,65 +540,201 @@ def find_space_for_sequence(lenght_sequence, height_sequence, doc, align, start_
         return start_x, start_y
     
 
-# Global variable to store all y values, allowing retrieval if y has already been calculated.
-x_intercept_cache = {}
-
-# Global variable to cache segments and avoid recalculation
-segments_cache = None
-
-# Rescale sequence if necessary
-def rescale_sequence(text, scale_factor, start_x, start_y):
-    sequence = NS()
-    for i, char in enumerate(text):
-         if char in number_segments_dict:
-              # Get the segments for the specified number (from the implemented dictionary)
-              segments = number_segments_dict[char]
-              # Scaled segments based on the scale factor
-              scaled_segments = [[x * scale_factor, y * scale_factor] for x, y in segments]
-              sequence.add_number(scaled_segments, [start_x, start_y])
-    return sequence
-             
+def find_space_in_grid(lenght_sequence, height_sequence, context, align, start_y, margin, resolution=None):
+    """
+    Finds a valid space for a sequence using the raster occupancy grid.
+
+    Every placement of the sequence rectangle (plus margin on each side) is tested
+    at once with the summed-area table; rows are then preferred from start_y upwards
+    and then downwards, like find_space_for_sequence.
 
-def sequence_dim(sequence, x_pos, y_pos, space):
+    Args:
+        lenght_sequence (float): The length of the sequence to be placed.
+        height_sequence (float): The height of the sequence to be placed.
+        context (PlacementContext): Geometry of the document.
+        align (str): The alignment of the sequence ('l' for left, 'c' for center, 'r' for right).
+        start_y (float): The starting y-coordinate for the search, relative to the bottom of the drawing.
+        margin (float): The margin to be kept around the sequence.
+        resolution (float, optional): Cell size of the grid (default: automatic).
+
+    Returns:
+        tuple: (start_x, start_y) of the sequence, or (None, None) if no valid space is found.
     """
-    Calculates the dimensions of a sequence and updates the positions of its components.
+    if not len(context.segs):
+        # No geometry (e.g. every layer excluded): the extents are infinite, no grid can be built
+        print('Sequence needs to be adjusted due to empty drawing.')
+        return None, None
+    grid = context.occupancy_grid(resolution)
+    n_cols = grid.cells_for(lenght_sequence + 2 * margin)
+    n_rows = grid.cells_for(height_sequence + 2 * margin)
+    fits = grid.fitting_blocks(n_rows, n_cols)
+    context.stats.y_candidates += len(fits)
+
+    rows_ok = np.nonzero(fits.any(axis=1))[0] if fits.size else fits
+    if len(rows_ok) == 0:
+        print('Sequence needs to be adjusted due to grid occupancy.')
+        return None, None
+
+    start_row = int((start_y - margin) // grid.resolution)
+    above = rows_ok[rows_ok >= start_row]
+    row = above[0] if len(above) else rows_ok[rows_ok < start_row][-1]
+
+    cols = np.nonzero(fits[row])[0]
+    block_width = n_cols * grid.resolution
+    if align == 'l':
+        col = cols[0]
+    elif align == 'r':
+        col = cols[-1]
+    else:
+        target = ((context.min_x + context.max_x) / 2 - block_width / 2 - grid.min_x) / grid.resolution
+        col = cols[np.argmin(np.abs(cols - target))]
+
+    x, y = grid.cell_origin(row, col)
+    if align == 'r':
+        return x + block_width - margin - lenght_sequence, y + margin
+    elif align == 'c':
+        return x + (block_width - lenght_sequence) / 2, y + margin
+    return x + margin, y + margin
+
+
+def find_space_in_rectangles(lenght_sequence, height_sequence, context, align, start_y, margin, min_height, resolution=None):
+    """
+    Finds the largest size and a position for a sequence from the maximal empty rectangles of the part.
+
+    The maximal empty rectangles are computed once per grid in a single sweep. For each of them
+    the largest sequence height that fits (keeping the length/height ratio of the sequence and
+    the margin on every side) is computed at once, so no rows are probed and no rescale search
+    is needed.
 
     Args:
-        sequence: An object containing the sequence of segments and their positions.
-        x_pos (float): The initial x-coordinate for positioning the sequence.
-        y_pos (float): The initial y-coordinate for positioning the sequence (not used in calculations).
-        space (float): The spacing factor between characters in the sequence.
+        lenght_sequence (float): The length of the sequence at its requested size.
+        height_sequence (float): The requested height of the sequence (upper bound of the result).
+        context (PlacementContext): Geometry of the document.
+        align (str): The alignment of the sequence ('l' for left, 'c' for center, 'r' for right).
+        start_y (float): Preferred y-coordinate, relative to the bottom of the drawing.
+        margin (float): The margin to be kept around the sequence.
+        min_height (float): Smallest acceptable height of the sequence.
+        resolution (float, optional): Cell size of the grid (default: automatic).
 
     Returns:
-        tuple: A tuple containing:
-            - lenght_sequence (float): The total length of the sequence after accounting for spacing.
-            - height_sequence (float): The maximum height of the sequence components.
+        tuple: (start_x, start_y, height) of the placed sequence, or (None, None, None) if even
+        min_height does not fit.
+    """
+    if not len(context.segs):
+        # No geometry (e.g. every layer excluded): the extents are infinite, no grid can be built
+        print('Sequence needs to be adjusted due to empty drawing.')
+        return None, None, None
+    grid = context.occupancy_grid(resolution)
+    blocks = context.maximal_rectangles(resolution)
+    context.stats.y_candidates += len(blocks)
+    res = grid.resolution
+
+    aspect = lenght_sequence / height_sequence
+    fit = np.minimum(blocks[:, 2] * res - 2 * margin, (blocks[:, 3] * res - 2 * margin) / aspect)
+    fit = np.minimum(fit, height_sequence)
+
+    if len(fit) == 0 or fit.max() < min_height:
+        print('Sequence needs to be adjusted due to empty rectangles.')
+        return None, None, None
+
+    # Among the rectangles giving the best height, prefer rows from start_y upwards, then align
+    best_height = fit.max()
+    candidates = np.nonzero(fit >= best_height - 1e-9)[0]
+    rows, cols, n_cols = blocks[candidates, 0], blocks[candidates, 1], blocks[candidates, 3]
+    start_row = int((start_y - margin) // res)
+    lenght = aspect * best_height
+    if align == 'l':
+        align_key = cols
+    elif align == 'r':
+        align_key = -(cols + n_cols)
+    else:
+        align_key = np.abs(grid.min_x + (cols + n_cols / 2) * res - (context.min_x + context.max_x) / 2)
+    choice = candidates[np.lexsort((align_key, np.abs(rows - start_row), rows < start_row))[0]]
+
+    x_left, y_bottom = grid.cell_origin(blocks[choice, 0], blocks[choice, 1])
+    x_right = x_left + blocks[choice, 3] * res
+    if align == 'l':
+        start_x = x_left + margin
+    elif align == 'r':
+        start_x = x_right - margin - lenght
+    else:
+        start_x = (context.min_x + context.max_x) / 2 - lenght / 2
+        start_x = min(max(start_x, x_left + margin), x_right - margin - lenght)
 
-    Overview:
-        This function iterates through the segments of the sequence to calculate the total width and height.
-        It updates the x-coordinate for each segment based on the specified spacing and returns the total dimensions.
+    return float(start_x), float(y_bottom + margin), float(best_height)
+
+
+def find_space_scored(lenght_sequence, height_sequence, context, align, start_y, step, margin):
     """
+    Finds the best space for a sequence among every candidate row at once.
 
-    x_position = x_pos
-    y_position = y_pos
-    lenght_sequence = 0.0
-    height_sequence = 0.0
-        
-    for scaled_segments, position in sequence.sequence:
-        number_width = max([x[0] for x in scaled_segments]) - min([x[0] for x in scaled_segments])
-        number_height = max([x[1] for x in scaled_segments]) - min([x[1] for x in scaled_segments])
-        height_sequence = max(number_height, height_sequence)
-        if number_width == 0:
-            number_height = max([x[1] for x in scaled_segments]) - min([x[1] for x in scaled_segments])
-            number_width = number_height / 2  # Larghezza fissa per il numero '1'
-        position[0] = x_position
-        x_position += number_width * space  # Aggiorna la posizione x in base allo spaziamento
-        lenght_sequence += number_width * space
-    
+    The bottom and top scanlines of all the rows come from one batched intercept call,
+    their spans are intersected across rows in one pass and the clearance of every span
+    wide enough is one batched test on the grid index. Each clear span is then scored by
+    distance of the label from the center of the drawing and side clearance (see
+    SCORE_WEIGHTS), instead of taking the first row that fits.
 
-    lenght_sequence -= number_width * (space - 1)
-    
-    return lenght_sequence, height_sequence
+    The text size is not scored: place_sequence runs the same rescale search as for the
+    scanline backend, so 'scored' places the same height and only picks a better position.
+
+    Args:
+        lenght_sequence (float): The length of the sequence to be placed.
+        height_sequence (float): The height of the sequence to be placed.
+        context (PlacementContext): Geometry of the document.
+        align (str): The alignment of the sequence ('l' for left, 'c' for center, 'r' for right).
+        start_y (float): The starting y-coordinate of the candidate rows.
+        step (float): Distance between candidate rows.
+        margin (float): The margin to be kept around the sequence.
+
+    Returns:
+        tuple: (start_x, start_y) of the best placement, or (None, None) if nothing fits.
+    """
+    y_to_try = find_candidate_y(context.min_y, context.max_y, height_sequence, start_y, step)
+    context.stats.y_candidates += len(y_to_try)
+    scanlines = context.x_intercepts(y_to_try + [y + height_sequence for y in y_to_try])
+
+    rows, lefts, rights = intersect_spans(scanlines[len(y_to_try):], scanlines[:len(y_to_try)])
+    wide = rights - lefts >= lenght_sequence + 2 * margin
+    rows, lefts, rights = rows[wide], lefts[wide], rights[wide]
+    if len(rows):
+        # Spans crossed by any edge between the two scanlines are dropped
+        clear = context.grid_index.spans_are_clear(y_to_try, height_sequence, rows, lefts, rights)
+        rows, lefts, rights = rows[clear], lefts[clear], rights[clear]
+    if not len(rows):
+        print('Sequence needs to be adjusted due to scored candidates.')
+        return None, None
+
+    center_x = (context.min_x + context.max_x) / 2
+    center_y = (context.min_y + context.max_y) / 2
+    half_diagonal = np.hypot(context.max_x - context.min_x, context.max_y - context.min_y) / 2 or 1.0
+
+    y = np.asarray(y_to_try, dtype=float)[rows]
+    if align == 'l':
+        x = lefts + margin
+    elif align == 'r':
+        x = rights - lenght_sequence - margin
+    else:
+        x = np.minimum(np.maximum(center_x - lenght_sequence / 2, lefts + margin), rights - margin - lenght_sequence)
+
+    distance = np.hypot(x + lenght_sequence / 2 - center_x, y + height_sequence / 2 - center_y) / half_diagonal
+    clearance = np.minimum(np.minimum(x - lefts, rights - x - lenght_sequence), height_sequence) / height_sequence
+    score = SCORE_WEIGHTS['clearance'] * clearance - SCORE_WEIGHTS['center'] * distance
+
+    # Ties go to the first row in search order (from start_y upwards, then downwards)
+    best = int(np.argmax(score))
+    return float(x[best]), float(y[best])
+
+
+def sequence_bounds(sequence):
+    """
+    Returns the (min_x, min_y, max_x, max_y) box of a placed sequence, or None if it is empty.
+    """
+    points = [np.asarray(scaled_segments, dtype=float).reshape(-1, 2) + np.asarray(position[:2], dtype=float)
+              for scaled_segments, position in sequence.sequence]
+    if not points:
+        return None
+    points = np.concatenate(points)
+    return (*map(float, points.min(axis=0)), *map(float, points.max(axis=0)))
 
 ##################################################################################################################
 # Level 0 -- Function to place sequence on valid point of model space
@@ -468,7 +742,10 @@ def sequence_dim(sequence, x_pos, y_pos, space):
 
 def place_sequence(doc, text, scale_factor, excluded_layers, space=1.5, min_char=5,\
                    max_char=20, arbitrary_x=None, arbitrary_y=None,\
-                   align='c', start_y=1, step=2, margin=1, down_to=None):
+                   align='c', start_y=1, step=2, margin=1, down_to=None,\
+                   cache_size=DEFAULT_CACHE_SIZE, rescale_tolerance=0.5,\
+                   method='scanline', raster_resolution=None, chord_error=MAX_CHORD_ERROR,\
+                   placement_cache=None, context=None, stats=None):
     """
     Places a sequence of characters at a valid position within the DXF area.
 
@@ -487,35 +764,62 @@ def place_sequence(doc, text, scale_factor, excluded_layers, space=1.5, min_char
         step (float): The step size for incrementing or decrementing the y-coordinate during the search (default is 2).
         margin (float): The margin to be added around the sequence (default is 1).
         down_to (float, optional): The minimum height to which the sequence can be resized (default is None).
+        cache_size (int): Max number of scanlines kept in the intercept cache (default is 4096).
+        rescale_tolerance (float): Precision, in character height, of the rescale search (default is 0.5).
+        method (str): Placement backend, 'scanline' (default), 'raster' (occupancy grid),
+            'rectangles' (maximal empty rectangles of the grid, gives the largest height directly) or
+            'scored' (every row evaluated in one batch, best span by centering and clearance; same
+            rescale search as 'scanline').
+        raster_resolution (float, optional): Cell size of the 'raster'/'rectangles' grid (default: automatic).
+        chord_error (float): Max distance between a circle or arc of the drawing and its chords (default is 0.1).
+        placement_cache (PlacementCache, optional): Persistent store of results; an unchanged drawing
+            placed again with the same text and parameters skips the search (default is None).
+        context (PlacementContext, optional): Geometry already computed for doc (e.g. shared by several
+            labels, with the labels placed so far added as obstacles); built from doc when None.
+        stats (PlacementStats, optional): Filled with the counters and phase timings of this placement.
 
     Returns:
         NS: The sequence object containing the placed characters and their positions.
 
     Raises:
         Exception: If the input text is empty.
-        ValueError: If 3D geometry is detected in the DXF file.
+        ValueError: If 3D geometry is detected in the DXF file, the method is unknown or
+            rescale_tolerance or chord_error is not positive.
 
     Overview:
         This function calculates the dimensions of the sequence based on the characters provided and attempts to
         place it within the specified document. It checks for valid positions based on the provided alignment and
         spacing, and resizes the sequence if necessary to fit within the defined constraints. If a valid position
-        cannot be found, the function will attempt to rescale the sequence until it either finds a valid position
-        or reaches the minimum height limit.
+        cannot be found, the function bisects the character height between down_to and the height that did not
+        fit, returning the largest sequence that fits (within rescale_tolerance) in O(log) placement attempts.
     """
     
-    x_intercept_cache.clear()  
-    segments_cache = None 
-
     if len(text) == 0:
         raise Exception('Empty sequence.')
+    if method not in ('scanline', 'raster', 'rectangles', 'scored'):
+        raise ValueError(f"Unknown placement method '{method}'.")
+    if not rescale_tolerance > 0:
+        raise ValueError(f"rescale_tolerance must be positive, got {rescale_tolerance}.")
+    if not chord_error > 0:
+        raise ValueError(f"chord_error must be positive, got {chord_error}.")
     
-    # ✅ Comp segs once and put in the cache
-    msp = doc.modelspace()
-    segments_cache = comp_segs_and_limits(msp, excluded_layers)
-    segs, min_x, min_y, max_x, max_y, is_2d = segments_cache
+    if stats is None:
+        stats = PlacementStats()
+
+    # ✅ Comp segs once, shared by every rescale attempt
+    if context is None:
+        context = PlacementContext(doc, excluded_layers, cache_size, chord_error)
+        stats.phase_times.update(context.stats.phase_times)
+    context.stats = stats
+    stats.segments = len(context.segs)
+    cache_hits, cache_misses = context.intercept_cache.hits, context.intercept_cache.misses
+
+    def record_cache_counters():
+        stats.cache_hits += context.intercept_cache.hits - cache_hits
+        stats.intercepts_computed += context.intercept_cache.misses - cache_misses
     
     # ✅ CHECK 3D
-    if not is_2d:
+    if not context.is_2d:
         file_name = doc.filename if hasattr(doc, 'filename') else 'unknown file'
         raise ValueError(dxf_3d_geometry_error(file_name))
         # raise ValueError(
@@ -528,9 +832,26 @@ def place_sequence(doc, text, scale_factor, excluded_layers, space=1.5, min_char
         #     "  • Ensure all Z coordinates are zero"
         # )
 
-    sequence = NS()
-       
-    height_sequence = 0.0
+    if placement_cache is not None:
+        with stats.phase('cache_lookup'):
+            key = placement_key(context.segs, text, {
+                'scale_factor': scale_factor, 'space': space, 'min_char': min_char, 'max_char': max_char,
+                'arbitrary_x': arbitrary_x, 'arbitrary_y': arbitrary_y, 'align': align, 'start_y': start_y,
+                'step': step, 'margin': margin, 'down_to': down_to, 'rescale_tolerance': rescale_tolerance,
+                'method': method, 'raster_resolution': raster_resolution,
+            })
+            stored = placement_cache.get(key)
+        if stored is not None:
+            stats.placement_cache_hit = True
+            record_cache_counters()
+            sequence = NS()
+            for scaled_segments, position in stored['sequence']:
+                sequence.add_number(scaled_segments, position)
+            stats.final_scale = stored['scale']
+            return sequence
+
+    # Glyph bounds gathered once: size and positions at any scale cost a few vector operations
+    layout = TextLayout(text, space)
     
     if arbitrary_x == None:
         x_pos = 0
@@ -542,46 +863,84 @@ def place_sequence(doc, text, scale_factor, excluded_layers, space=1.5, min_char
     else:
         y_pos = arbitrary_y
     
-    for i, char in enumerate(text):
-         if char in number_segments_dict:
-              # Get segments for the specified character from the implemented dictionary
-              segments = number_segments_dict[char]
-              # Scale the segments based on the scale factor
-              scaled_segments = [[x * scale_factor, y * scale_factor] for x, y in segments]
-              sequence.add_number(scaled_segments, [x_pos, y_pos])
-              number_height = max([x[1] for x in scaled_segments]) - min([x[1] for x in scaled_segments])
-              height_sequence = max(number_height, height_sequence)
+    height_sequence = layout.height(scale_factor)
                   
     if height_sequence < min_char:
         scale_factor = scale_factor / height_sequence * min_char
-        sequence = rescale_sequence(text, scale_factor, x_pos, y_pos)
     elif height_sequence > max_char:
         scale_factor = scale_factor / height_sequence * max_char
-        sequence = rescale_sequence(text, scale_factor, x_pos, y_pos)
         
-    lenght_sequence, height_sequence = sequence_dim(sequence, x_pos, y_pos, space)
+    lenght_sequence, height_sequence = layout.dims(scale_factor)
+    # Scale of the laid out text, reduced when the sequence does not fit
+    scale = scale_factor
     
     if arbitrary_x == None or arbitrary_y == None:
-        x, y = find_space_for_sequence(lenght_sequence, height_sequence, doc, align, start_y, step, margin, excluded_layers)
-        if down_to == None:
-            down_to = min_char
-        while x == None or y == None:
-            rescale_factor = 0.8
-            new_height_sequence = height_sequence * rescale_factor
-            if new_height_sequence < down_to:
-                break
+        with stats.phase('search'):
+            if down_to == None:
+                down_to = min_char
+
+            if method == 'rectangles':
+                # The solver gives the height that fits directly, no rescale search needed
+                x, y, fit_height = find_space_in_rectangles(lenght_sequence, height_sequence, context, align, start_y,
+                                                            margin, min(down_to, height_sequence), raster_resolution)
+                if fit_height != None and fit_height < height_sequence:
+                    scale = scale_factor * fit_height / height_sequence
             else:
-                scale_factor = scale_factor * rescale_factor
-                sequence = rescale_sequence(text, scale_factor, x_pos, y_pos)
-                lenght_sequence, height_sequence = sequence_dim(sequence, x_pos, y_pos, space)
-                x, y = find_space_for_sequence(lenght_sequence, height_sequence, doc, align, start_y, step, margin, excluded_layers)
-        if x == None or y == None:
-            sequence = NS()
-        else:
-            for scaled_segments, position in sequence.sequence:
-                position[0] += x 
-                position[1] += y
+                def find_space(lenght, height):
+                    """Searches a position with the selected placement backend."""
+                    if method == 'raster':
+                        return find_space_in_grid(lenght, height, context, align, start_y, margin, raster_resolution)
+                    if method == 'scored':
+                        return find_space_scored(lenght, height, context, align, start_y, step, margin)
+                    return find_space_for_sequence(lenght, height, doc, align, start_y, step, margin, excluded_layers, context)
+
+                def try_scale(scale):
+                    """Searches a position for the text at the given scale."""
+                    stats.rescale_iterations += 1
+                    return find_space(*layout.dims(scale))
+
+                x, y = find_space(lenght_sequence, height_sequence)
+
+                # Bisection on the scale between down_to and the height that did not fit.
+                # The text height is proportional to the scale, so the bounds map directly.
+                if (x == None or y == None) and height_sequence > down_to:
+                    high_scale = scale_factor
+                    low_scale = scale_factor * down_to / height_sequence
+                    scale = low_scale
+                    x, y = try_scale(low_scale)
+                    if x != None and y != None:
+                        for _ in range(MAX_RESCALE_ITERATIONS):
+                            if (high_scale - low_scale) / scale_factor * height_sequence <= rescale_tolerance:
+                                break
+                            mid_scale = (low_scale + high_scale) / 2
+                            candidate = try_scale(mid_scale)
+                            if candidate[0] != None and candidate[1] != None:
+                                low_scale = scale = mid_scale
+                                x, y = candidate
+                            else:
+                                high_scale = mid_scale
 
+    with stats.phase('layout'):
+        sequence = NS()
+        for scaled_segments, position in layout.strokes(scale, x_pos, y_pos):
+            sequence.add_number(scaled_segments, position)
+
+        if arbitrary_x == None or arbitrary_y == None:
+            if x == None or y == None:
+                sequence = NS()
+            else:
+                for scaled_segments, position in sequence.sequence:
+                    position[0] += x 
+                    position[1] += y
+
+    record_cache_counters()
+    stats.final_scale = float(scale) if sequence.sequence else None
+
+    if placement_cache is not None:
+        placement_cache.put(key, {
+            'scale': stats.final_scale,
+            'sequence': [[scaled_segments, position] for scaled_segments, position in sequence.sequence],
+        })
     
     return sequence
 
@@ -0,0 +1,237 @@
+"""
+Raster placement backend.
+
+The material region of the drawing is rasterized into a boolean grid and a
+summed-area table of the blocked cells is built on top of it, so testing
+whether a rectangle lies fully inside the material and away from every edge
+costs O(1) regardless of how many segments the drawing has.
+"""
+import math
+
+import numpy as np
+
+
+# Number of cells of the grid when the resolution is chosen automatically
+AUTO_GRID_CELLS = 2 ** 18
+
+
+def auto_resolution(min_x, min_y, max_x, max_y):
+    """Returns a square cell size giving about AUTO_GRID_CELLS cells over the drawing extents."""
+    width, height = max_x - min_x, max_y - min_y
+    if width > 0 and height > 0:
+        return math.sqrt(width * height / AUTO_GRID_CELLS)
+    longest = max(width, height)
+    return longest / AUTO_GRID_CELLS if longest > 0 else 1.0
+
+
+class OccupancyGrid:
+    """
+    Boolean occupancy grid of a drawing with a summed-area table of blocked cells.
+
+    A cell is free when its center is inside the material (odd number of scanline
+    intercepts on its left) and no segment passes through it. Row 0 / column 0 is
+    the cell at (min_x, min_y).
+    """
+
+    def __init__(self, index, min_x, min_y, max_x, max_y, resolution=None, material_index=None):
+        """
+        Rasterizes the drawing.
+
+        Args:
+            index (SegmentIndex): Segment index of the drawing.
+            min_x, min_y, max_x, max_y (float): Extents of the drawing.
+            resolution (float, optional): Cell size in drawing units (default: automatic).
+            material_index (SegmentIndex or MaterialIndex, optional): Index deciding the material by
+                even-odd rule, e.g. only the closed loops (default: index).
+        """
+        if resolution is None:
+            resolution = auto_resolution(min_x, min_y, max_x, max_y)
+        self.resolution = float(resolution)
+        self.min_x = min_x
+        self.min_y = min_y
+        self.n_cols = max(1, int(math.ceil((max_x - min_x) / self.resolution)))
+        self.n_rows = max(1, int(math.ceil((max_y - min_y) / self.resolution)))
+
+        material = self._material(index if material_index is None else material_index)
+        self.free = material & ~self._edges(index.segs)
+
+        self._update_sat()
+
+    def _update_sat(self):
+        """sat[r, c] = number of blocked cells in rows < r and columns < c."""
+        blocked = (~self.free).astype(np.int64)
+        self.sat = np.zeros((self.n_rows + 1, self.n_cols + 1), dtype=np.int64)
+        self.sat[1:, 1:] = blocked.cumsum(axis=0).cumsum(axis=1)
+
+    def block(self, x_min, y_min, x_max, y_max):
+        """Marks every cell overlapping the rectangle as blocked (e.g. a label already placed)."""
+        res = self.resolution
+        first_col = max(0, int(math.floor((x_min - self.min_x) / res)))
+        first_row = max(0, int(math.floor((y_min - self.min_y) / res)))
+        last_col = min(self.n_cols, int(math.ceil((x_max - self.min_x) / res)))
+        last_row = min(self.n_rows, int(math.ceil((y_max - self.min_y) / res)))
+        if first_col < last_col and first_row < last_row:
+            self.free[first_row:last_row, first_col:last_col] = False
+            self._update_sat()
+
+    def _material(self, index):
+        """Marks the cells whose center is inside the material (even-odd rule on each row)."""
+        res = self.resolution
+        row_centers = self.min_y + (np.arange(self.n_rows) + 0.5) * res
+
+        # Difference array: +1 at the first filled column of an interval, -1 after the last
+        diff = np.zeros((self.n_rows, self.n_cols + 1), dtype=np.int32)
+        rows, starts, ends = [], [], []
+        for row, x_intercept in enumerate(index.x_intercepts(row_centers)):
+            for left, right in zip(x_intercept[0::2], x_intercept[1::2]):
+                rows.append(row)
+                starts.append(left)
+                ends.append(right)
+
+        if rows:
+            first_col = np.ceil((np.array(starts) - self.min_x) / res - 0.5).astype(np.int64)
+            last_col = np.floor((np.array(ends) - self.min_x) / res - 0.5).astype(np.int64)
+            first_col = np.clip(first_col, 0, self.n_cols)
+            last_col = np.clip(last_col + 1, 0, self.n_cols)
+            valid = last_col > first_col
+            rows = np.array(rows)[valid]
+            np.add.at(diff, (rows, first_col[valid]), 1)
+            np.add.at(diff, (rows, last_col[valid]), -1)
+
+        return diff.cumsum(axis=1)[:, :-1] > 0
+
+    def _edges(self, segs):
+        """Marks every cell crossed by a segment (sampled at a quarter of the cell size)."""
+        edges = np.zeros((self.n_rows, self.n_cols), dtype=bool)
+        if len(segs) == 0:
+            return edges
+
+        res = self.resolution
+        lengths = np.hypot(segs[:, 2] - segs[:, 0], segs[:, 3] - segs[:, 1])
+        n_samples = np.ceil(lengths / (res / 4)).astype(np.int64) + 1
+        seg_ids = np.repeat(np.arange(len(segs)), n_samples)
+        offsets = np.arange(len(seg_ids)) - np.repeat(np.cumsum(n_samples) - n_samples, n_samples)
+        t = offsets / np.maximum(n_samples[seg_ids] - 1, 1)
+
+        x = segs[seg_ids, 0] + t * (segs[seg_ids, 2] - segs[seg_ids, 0])
+        y = segs[seg_ids, 1] + t * (segs[seg_ids, 3] - segs[seg_ids, 1])
+        cols = np.clip(np.floor((x - self.min_x) / res).astype(np.int64), 0, self.n_cols - 1)
+        rows = np.clip(np.floor((y - self.min_y) / res).astype(np.int64), 0, self.n_rows - 1)
+        edges[rows, cols] = True
+        return edges
+
+    def cells_for(self, length):
+        """Number of cells needed to cover a length."""
+        return max(1, int(math.ceil(length / self.resolution - 1e-9)))
+
+    def blocked_count(self, row, col, n_rows, n_cols):
+        """Number of blocked cells in the block starting at (row, col), in O(1)."""
+        if row < 0 or col < 0 or row + n_rows > self.n_rows or col + n_cols > self.n_cols:
+            return n_rows * n_cols
+        sat = self.sat
+        return int(sat[row + n_rows, col + n_cols] - sat[row, col + n_cols]
+                   - sat[row + n_rows, col] + sat[row, col])
+
+    def is_free(self, x, y, width, height, margin=0):
+        """
+        Checks in O(1) if a rectangle is fully inside the material and at least
+        margin away from every edge.
+        """
+        left = x - margin
+        bottom = y - margin
+        col = int(math.floor((left - self.min_x) / self.resolution))
+        row = int(math.floor((bottom - self.min_y) / self.resolution))
+        n_cols = int(math.ceil((x + width + margin - self.min_x) / self.resolution)) - col
+        n_rows = int(math.ceil((y + height + margin - self.min_y) / self.resolution)) - row
+        return self.blocked_count(row, col, n_rows, n_cols) == 0
+
+    def fitting_blocks(self, n_rows, n_cols):
+        """
+        Tests every placement of an n_rows x n_cols block at once.
+
+        Returns:
+            ndarray: Boolean array, True at [row, col] when the block with its lower-left
+            cell there is completely free. Empty if the block is larger than the grid.
+        """
+        if n_rows > self.n_rows or n_cols > self.n_cols:
+            return np.zeros((0, 0), dtype=bool)
+        sat = self.sat
+        blocked = (sat[n_rows:, n_cols:] - sat[:-n_rows, n_cols:]
+                   - sat[n_rows:, :-n_cols] + sat[:-n_rows, :-n_cols])
+        return blocked == 0
+
+    def cell_origin(self, row, col):
+        """Drawing coordinates of the lower-left corner of a cell."""
+        return self.min_x + col * self.resolution, self.min_y + row * self.resolution
+
+    def maximal_rectangles(self):
+        """
+        Finds the maximal empty rectangles of the grid in one sweep over the rows.
+
+        For every free cell the column of free cells below it is extended left and
+        right while the neighbouring columns are at least as tall (nearest lower
+        bar, computed for all rows at once by pointer jumping). Rectangles that could
+        still grow upwards are dropped, so every result is a maximal empty rectangle.
+
+        Returns:
+            ndarray: (K, 4) int array of (row, col, n_rows, n_cols) blocks.
+        """
+        # heights[r, c] = number of consecutive free cells ending at row r in column c
+        heights = np.zeros((self.n_rows, self.n_cols), dtype=np.int64)
+        run = np.zeros(self.n_cols, dtype=np.int64)
+        for row in range(self.n_rows):
+            run = np.where(self.free[row], run + 1, 0)
+            heights[row] = run
+
+        left = self._nearest_lower(heights)
+        right = self.n_cols - 1 - self._nearest_lower(heights[:, ::-1])[:, ::-1]
+
+        # Equal neighbouring bars give the same rectangle: keep the first of each run
+        first_of_run = np.ones_like(heights, dtype=bool)
+        first_of_run[:, 1:] = heights[:, 1:] != heights[:, :-1]
+        rows, cols = np.nonzero((heights > 0) & first_of_run)
+
+        # Bars of equal height split by taller ones still share a rectangle
+        key = (rows * self.n_cols + left[rows, cols] + 1) * (self.n_rows + 1) + heights[rows, cols]
+        _, unique = np.unique(key, return_index=True)
+        rows, cols = rows[unique], cols[unique]
+
+        top = rows
+        n_rows = heights[rows, cols]
+        first_col = left[rows, cols] + 1
+        end_col = right[rows, cols]
+
+        # Keep only rectangles blocked above (or touching the top of the grid)
+        blocked_prefix = np.zeros((self.n_rows + 1, self.n_cols + 1), dtype=np.int64)
+        blocked_prefix[:-1, 1:] = np.cumsum(~self.free, axis=1)
+        above = np.minimum(top + 1, self.n_rows)
+        maximal = (top + 1 == self.n_rows) | (blocked_prefix[above, end_col] - blocked_prefix[above, first_col] > 0)
+
+        return np.stack([top - n_rows + 1, first_col, n_rows, end_col - first_col], axis=1)[maximal]
+
+    @staticmethod
+    def _nearest_lower(heights):
+        """
+        Column of the nearest bar on the left strictly lower than each bar (-1 if none).
+
+        Uses a sparse table of range minimums on each row and binary lifting, so the
+        whole grid is solved in O(log(n_cols)) vectorized passes.
+        """
+        n_rows, n_cols = heights.shape
+        heights = heights.astype(np.int32)
+
+        # table[k][:, i] = min of heights[:, i:i + 2**k]
+        table = [heights]
+        while 2 ** len(table) <= n_cols:
+            half = 2 ** (len(table) - 1)
+            previous = table[-1]
+            table.append(np.minimum(previous[:, :-half], previous[:, half:]))
+
+        # pos = start of the run of bars >= the current bar ending just before it
+        pos = np.broadcast_to(np.arange(n_cols), (n_rows, n_cols)).copy()
+        for level in range(len(table) - 1, -1, -1):
+            start = pos - 2 ** level
+            window_min = np.take_along_axis(table[level], np.maximum(start, 0), axis=1)
+            pos = np.where((start >= 0) & (window_min >= heights), start, pos)
+
+        return pos - 1
@@ -0,0 +1,242 @@
+"""
+Scanline engine for the placement algorithm.
+
+Segments are kept as an (N, 4) float array of (start_x, start_y, end_x, end_y)
+rows, so the x-intercepts of a whole batch of horizontal lines can be computed
+with a single vectorized call instead of a Python loop per segment.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Max number of (y, segment) pairs evaluated at once, bounds the memory of a batch
+MAX_BATCH_CELLS = 2 ** 22
+
+# Default max number of scanlines kept by an InterceptCache
+DEFAULT_CACHE_SIZE = 4096
+
+
+def segs_to_array(segs):
+    """Converts an iterable of (start_x, start_y, end_x, end_y) tuples to an (N, 4) float array."""
+    arr = np.asarray(segs, dtype=float)
+    if arr.size == 0:
+        return np.empty((0, 4), dtype=float)
+    return arr.reshape(-1, 4)
+
+
+def x_intercepts(ys, segs):
+    """
+    Computes the sorted x-intercepts of a batch of horizontal lines.
+
+    Args:
+        ys: Iterable of y values of the horizontal lines.
+        segs: (N, 4) array (or list of tuples) of segments.
+
+    Returns:
+        list: One sorted list of x-intercepts for each y, in the same order as ys.
+
+    Note:
+        Same rule as the original per-segment loop: a segment is crossed when y lies
+        between its end points (both included) and horizontal segments are skipped.
+        The arithmetic is done in the same order, so results match bit for bit.
+    """
+    ys = np.asarray(ys, dtype=float).reshape(-1)
+    segs = segs_to_array(segs)
+
+    if len(ys) == 0:
+        return []
+    if len(segs) == 0:
+        return [[] for _ in ys]
+
+    start_x, start_y, end_x, end_y = segs[:, 0], segs[:, 1], segs[:, 2], segs[:, 3]
+    not_horizontal = start_y != end_y
+
+    chunk = max(1, MAX_BATCH_CELLS // len(segs))
+    result = []
+    for first in range(0, len(ys), chunk):
+        y = ys[first:first + chunk, None]
+        crossing = (((start_y >= y) & (y >= end_y)) | ((start_y <= y) & (y <= end_y))) & not_horizontal
+        rows, cols = np.nonzero(crossing)
+
+        y_rows = y[rows, 0]
+        x = (y_rows - start_y[cols]) / (end_y[cols] - start_y[cols]) * (end_x[cols] - start_x[cols]) + start_x[cols]
+
+        # Sort by row first, then by x inside each row
+        order = np.lexsort((x, rows))
+        x = x[order]
+        counts = np.bincount(rows, minlength=len(y))
+        bounds = np.cumsum(counts)[:-1]
+        result.extend(part.tolist() for part in np.split(x, bounds))
+
+    return result
+
+
+class SegmentIndex:
+    """
+    Y-bucket grid over segments, built once per document.
+
+    The y range of the drawing is split into equal buckets and every segment is
+    registered in the buckets its y span covers. A scanline at y then only tests
+    the segments of its own bucket instead of every segment of the drawing.
+    """
+
+    def __init__(self, segs, bucket_count=None):
+        """
+        Builds the index.
+
+        Args:
+            segs: (N, 4) array (or list of tuples) of segments.
+            bucket_count (int, optional): Number of y buckets (default grows with sqrt(N)).
+        """
+        self.segs = segs_to_array(segs)
+        n_segs = len(self.segs)
+
+        low = np.minimum(self.segs[:, 1], self.segs[:, 3])
+        high = np.maximum(self.segs[:, 1], self.segs[:, 3])
+
+        if bucket_count is None:
+            bucket_count = min(4096, 2 * int(np.sqrt(n_segs)) + 1)
+        self.bucket_count = max(1, int(bucket_count))
+
+        self.y_min = float(low.min()) if n_segs else 0.0
+        self.y_max = float(high.max()) if n_segs else 0.0
+        self.bucket_height = (self.y_max - self.y_min) / self.bucket_count or 1.0
+
+        # CSR layout: segment ids grouped by bucket, bucket b owns items[starts[b]:starts[b + 1]]
+        first = self._bucket_of(low)
+        last = self._bucket_of(high)
+        spans = last - first + 1
+        seg_ids = np.repeat(np.arange(n_segs), spans)
+        offsets = np.arange(len(seg_ids)) - np.repeat(np.cumsum(spans) - spans, spans)
+        buckets = np.repeat(first, spans) + offsets
+
+        order = np.argsort(buckets, kind='stable')
+        self.items = seg_ids[order]
+        self.starts = np.searchsorted(buckets[order], np.arange(self.bucket_count + 1))
+
+    def __len__(self):
+        return len(self.segs)
+
+    def _bucket_of(self, y):
+        """Returns the bucket of each y value (clipped to the grid)."""
+        bucket = np.floor((np.asarray(y, dtype=float) - self.y_min) / self.bucket_height)
+        return np.clip(bucket, 0, self.bucket_count - 1).astype(np.intp)
+
+    def candidates(self, y):
+        """Returns the ids of the segments that may span the horizontal line at y."""
+        if not len(self.segs) or not self.y_min <= y <= self.y_max:
+            return self.items[:0]
+        bucket = int(self._bucket_of(y))
+        return self.items[self.starts[bucket]:self.starts[bucket + 1]]
+
+    def x_intercepts(self, ys):
+        """
+        Computes the sorted x-intercepts of a batch of horizontal lines.
+
+        Same output as scanline.x_intercepts on the full segment array, but each
+        y is only tested against the segments of its bucket.
+        """
+        ys = np.asarray(ys, dtype=float).reshape(-1)
+        result = [[] for _ in ys]
+        if not len(self.segs) or not len(ys):
+            return result
+
+        inside = np.nonzero((ys >= self.y_min) & (ys <= self.y_max))[0]
+        buckets = self._bucket_of(ys[inside])
+        for bucket in np.unique(buckets):
+            rows = inside[buckets == bucket]
+            seg_ids = self.items[self.starts[bucket]:self.starts[bucket + 1]]
+            for row, x_intercept in zip(rows, x_intercepts(ys[rows], self.segs[seg_ids])):
+                result[row] = x_intercept
+
+        return result
+
+
+class MaterialIndex:
+    """
+    Scanline index of a drawing with open contours (e.g. marking or construction lines).
+
+    The material is decided by the even-odd rule on the closed loops only, so an open
+    chain never flips it. Where an open chain crosses the material it is returned as a
+    zero-width pair of intercepts: the material span is split there without changing
+    the parity, and callers reading the intercepts in pairs see two spans.
+    """
+
+    def __init__(self, closed_segs, open_segs):
+        """
+        Args:
+            closed_segs: (N, 4) array of the segments of the closed loops.
+            open_segs: (M, 4) array of the segments of the open chains.
+        """
+        self.closed = SegmentIndex(closed_segs)
+        self.open = SegmentIndex(open_segs)
+        self.segs = self.closed.segs
+
+    def __len__(self):
+        return len(self.closed)
+
+    def x_intercepts(self, ys):
+        """Sorted x-intercepts of a batch of horizontal lines, open crossings doubled inside the material."""
+        result = []
+        for closed, cuts in zip(self.closed.x_intercepts(ys), self.open.x_intercepts(ys)):
+            if cuts and closed:
+                # An odd number of closed intercepts on the left: the cut lies in the material
+                inside = [x for x in cuts if np.searchsorted(closed, x, side='right') % 2 == 1]
+                closed = sorted(closed + inside + inside)
+            result.append(closed)
+        return result
+
+
+class InterceptCache:
+    """
+    Bounded LRU cache of x-intercepts keyed by y, owned by a single document.
+
+    Access is guarded by a lock, so a cache can be shared by threads working on
+    the same document. Hits and misses are counted for diagnostics.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            maxsize (int): Max number of scanlines kept (None for unbounded).
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, y, default=None):
+        """Returns the intercepts cached for y (marking them as recently used), or default."""
+        with self._lock:
+            if y in self._data:
+                self._data.move_to_end(y)
+                self.hits += 1
+                return self._data[y]
+            self.misses += 1
+            return default
+
+    def __setitem__(self, y, x_intercept):
+        with self._lock:
+            self._data[y] = x_intercept
+            self._data.move_to_end(y)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def update(self, items):
+        """Stores several (y, intercepts) pairs."""
+        for y, x_intercept in items:
+            self[y] = x_intercept
+
+    def clear(self):
+        """Drops all entries and resets the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
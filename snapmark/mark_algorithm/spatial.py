@@ -0,0 +1,205 @@
+"""
+Spatial index over segment bounding boxes.
+
+The extents of the drawing are split into a uniform grid of square cells and
+every segment is registered in the cells its bounding box covers. Clearance of
+a candidate rectangle is then one grid query plus an exact segment-rectangle
+test on the few segments found, instead of probing horizontal sub-rows.
+"""
+import numpy as np
+
+from snapmark.mark_algorithm.scanline import segs_to_array
+
+
+# Max number of cells along each side of the grid
+MAX_GRID_SIDE = 1024
+# Max number of (segment, span) comparisons of spans_are_clear held in memory at once
+MAX_BATCH_PAIRS = 1 << 21
+
+
+def segments_intersect_rect(segs, x_min, y_min, x_max, y_max):
+    """
+    Exact segment-rectangle intersection test (Liang-Barsky), vectorized.
+
+    Args:
+        segs: (N, 4) array of segments.
+        x_min, y_min, x_max, y_max (float): The rectangle (boundary included).
+
+    Returns:
+        ndarray: Boolean array, True for every segment touching the rectangle.
+    """
+    segs = np.asarray(segs, dtype=float).reshape(-1, 4)
+    start_x, start_y = segs[:, 0], segs[:, 1]
+    dx, dy = segs[:, 2] - start_x, segs[:, 3] - start_y
+
+    t_enter = np.zeros(len(segs))
+    t_exit = np.ones(len(segs))
+    hit = np.ones(len(segs), dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p, q in ((-dx, start_x - x_min), (dx, x_max - start_x),
+                     (-dy, start_y - y_min), (dy, y_max - start_y)):
+            parallel = p == 0
+            hit &= ~(parallel & (q < 0))
+            t = q / p
+            t_enter = np.where(~parallel & (p < 0), np.maximum(t_enter, t), t_enter)
+            t_exit = np.where(~parallel & (p > 0), np.minimum(t_exit, t), t_exit)
+
+    return hit & (t_enter <= t_exit)
+
+
+class GridIndex:
+    """
+    Uniform grid over the bounding boxes of the segments, built once per document.
+
+    Cells are stored in CSR layout like SegmentIndex: cell c owns
+    items[starts[c]:starts[c + 1]].
+    """
+
+    def __init__(self, segs, cell_size=None):
+        """
+        Builds the index.
+
+        Args:
+            segs: (N, 4) array (or list of tuples) of segments.
+            cell_size (float, optional): Side of the cells (default: about one segment per cell).
+        """
+        self.segs = segs_to_array(segs)
+        n_segs = len(self.segs)
+
+        self.seg_min_x = np.minimum(self.segs[:, 0], self.segs[:, 2])
+        self.seg_max_x = np.maximum(self.segs[:, 0], self.segs[:, 2])
+        self.seg_min_y = np.minimum(self.segs[:, 1], self.segs[:, 3])
+        self.seg_max_y = np.maximum(self.segs[:, 1], self.segs[:, 3])
+
+        self.min_x = float(self.seg_min_x.min()) if n_segs else 0.0
+        self.min_y = float(self.seg_min_y.min()) if n_segs else 0.0
+        width = float(self.seg_max_x.max()) - self.min_x if n_segs else 0.0
+        height = float(self.seg_max_y.max()) - self.min_y if n_segs else 0.0
+
+        if cell_size is None:
+            cell_size = np.sqrt(width * height / max(n_segs, 1)) or max(width, height) / max(n_segs, 1)
+        cell_size = max(cell_size or 1.0, max(width, height) / MAX_GRID_SIDE, 1e-9)
+        self.cell_size = float(cell_size)
+        self.n_cols = int(width // self.cell_size) + 1
+        self.n_rows = int(height // self.cell_size) + 1
+
+        first_col, last_col = self._col_of(self.seg_min_x), self._col_of(self.seg_max_x)
+        first_row, last_row = self._row_of(self.seg_min_y), self._row_of(self.seg_max_y)
+        n_cols_spanned = last_col - first_col + 1
+        spans = n_cols_spanned * (last_row - first_row + 1)
+
+        # Every (segment, cell) pair of the bounding boxes
+        seg_ids = np.repeat(np.arange(n_segs), spans)
+        offsets = np.arange(len(seg_ids)) - np.repeat(np.cumsum(spans) - spans, spans)
+        rows = first_row[seg_ids] + offsets // n_cols_spanned[seg_ids]
+        cols = first_col[seg_ids] + offsets % n_cols_spanned[seg_ids]
+        cells = rows * self.n_cols + cols
+
+        order = np.argsort(cells, kind='stable')
+        self.items = seg_ids[order]
+        self.starts = np.searchsorted(cells[order], np.arange(self.n_rows * self.n_cols + 1))
+
+    def __len__(self):
+        return len(self.segs)
+
+    def _col_of(self, x):
+        col = np.floor((np.asarray(x, dtype=float) - self.min_x) / self.cell_size)
+        return np.clip(col, 0, self.n_cols - 1).astype(np.intp)
+
+    def _row_of(self, y):
+        row = np.floor((np.asarray(y, dtype=float) - self.min_y) / self.cell_size)
+        return np.clip(row, 0, self.n_rows - 1).astype(np.intp)
+
+    def query(self, x_min, y_min, x_max, y_max):
+        """Returns the ids of the segments whose bounding box overlaps the rectangle."""
+        if not len(self.segs):
+            return self.items[:0]
+        first_col, last_col = int(self._col_of(x_min)), int(self._col_of(x_max))
+        first_row, last_row = int(self._row_of(y_min)), int(self._row_of(y_max))
+
+        parts = [self.items[self.starts[row * self.n_cols + first_col]:self.starts[row * self.n_cols + last_col + 1]]
+                 for row in range(first_row, last_row + 1)]
+        ids = np.unique(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+
+        overlap = ((self.seg_min_x[ids] <= x_max) & (self.seg_max_x[ids] >= x_min)
+                   & (self.seg_min_y[ids] <= y_max) & (self.seg_max_y[ids] >= y_min))
+        return np.unique(ids[overlap]) if len(parts) == 1 else ids[overlap]
+
+    def rect_is_clear(self, x_min, y_min, x_max, y_max, tolerance=1e-9):
+        """
+        True if no segment enters the interior of the rectangle.
+
+        Segments lying on the border (e.g. the edges bounding a span) are allowed:
+        the rectangle is shrunk by tolerance before the exact test.
+        """
+        x_min, y_min = x_min + tolerance, y_min + tolerance
+        x_max, y_max = x_max - tolerance, y_max - tolerance
+        if x_min > x_max or y_min > y_max:
+            return True
+        ids = self.query(x_min, y_min, x_max, y_max)
+        return not len(ids) or not segments_intersect_rect(self.segs[ids], x_min, y_min, x_max, y_max).any()
+
+    def spans_are_clear(self, ys, height, rows, lefts, rights, tolerance=1e-9):
+        """
+        Batched rect_is_clear of spans lying on rows of the same height.
+
+        Span i is the rectangle [lefts[i], rights[i]] x [ys[rows[i]], ys[rows[i]] + height];
+        the spans of one row must not overlap. Every segment is paired with the rows whose
+        band its y range reaches (one sorted search), clipped to the band and compared with
+        the spans of those rows, so the whole batch costs a few array operations instead
+        of one grid query per span.
+
+        Returns:
+            ndarray: Boolean array, True for every span no segment enters.
+        """
+        ys = np.asarray(ys, dtype=float)
+        rows = np.asarray(rows, dtype=np.intp)
+        lefts = np.asarray(lefts, dtype=float) + tolerance
+        rights = np.asarray(rights, dtype=float) - tolerance
+        clear = np.ones(len(rows), dtype=bool)
+        if not len(rows) or not len(self.segs):
+            return clear
+
+        # Spans grouped by row, rows sorted by y
+        order = np.lexsort((lefts, rows, ys[rows]))
+        span_rows, lefts, rights = rows[order], lefts[order], rights[order]
+        group_start = np.flatnonzero(np.r_[True, span_rows[1:] != span_rows[:-1]])
+        group_count = np.diff(np.r_[group_start, len(order)])
+        band_low = ys[span_rows[group_start]] + tolerance
+        band_high = band_low + height - 2 * tolerance
+
+        # Rows whose band the y range of each segment reaches
+        first = np.searchsorted(band_low, self.seg_min_y - height + 2 * tolerance, 'left')
+        last = np.searchsorted(band_low, self.seg_max_y, 'right')
+        counts = np.maximum(last - first, 0)
+        seg_ids = np.repeat(np.arange(len(self.segs)), counts)
+        groups = np.repeat(first, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+
+        # x range of each segment inside the band of its row
+        start_x, start_y, end_x, end_y = self.segs[seg_ids].T
+        dx, dy = end_x - start_x, end_y - start_y
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_low = (band_low[groups] - start_y) / dy
+            t_high = (band_high[groups] - start_y) / dy
+        horizontal = dy == 0
+        t_enter = np.where(horizontal, 0.0, np.clip(np.minimum(t_low, t_high), 0.0, 1.0))
+        t_exit = np.where(horizontal, 1.0, np.clip(np.maximum(t_low, t_high), 0.0, 1.0))
+        x_enter, x_exit = start_x + t_enter * dx, start_x + t_exit * dx
+        seg_left, seg_right = np.minimum(x_enter, x_exit), np.maximum(x_enter, x_exit)
+
+        # Every (segment, span of its row) pair, in chunks of at most MAX_BATCH_PAIRS
+        span_counts = group_count[groups]
+        bounds = np.cumsum(span_counts)
+        blocked = np.zeros(len(order), dtype=bool)
+        chunk_starts = np.searchsorted(bounds, np.arange(0, bounds[-1] if len(bounds) else 0, MAX_BATCH_PAIRS), 'right')
+        for chunk_first, chunk_last in zip(chunk_starts, np.r_[chunk_starts[1:], len(groups)]):
+            pairs = np.arange(chunk_first, chunk_last)
+            n_spans = span_counts[pairs]
+            pair_ids = np.repeat(pairs, n_spans)
+            span_ids = (np.repeat(group_start[groups[pairs]], n_spans)
+                        + (np.arange(n_spans.sum()) - np.repeat(np.cumsum(n_spans) - n_spans, n_spans)))
+            hit = (seg_right[pair_ids] >= lefts[span_ids]) & (seg_left[pair_ids] <= rights[span_ids])
+            blocked[span_ids[hit]] = True
+
+        clear[order] = ~blocked
+        return clear
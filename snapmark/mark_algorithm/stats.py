@@ -0,0 +1,64 @@
+"""
+Instrumentation of the placement engine.
+
+place_sequence fills one PlacementStats per call: size of the geometry, how much
+searching was done and the wall time of each phase, so slow files can be explained
+without a profiler.
+"""
+import time
+from contextlib import contextmanager
+
+
+class PlacementStats:
+    """
+    Counters and phase timings of one placement.
+
+    Attributes:
+        segments (int): Number of tessellated segments of the drawing.
+        y_candidates (int): Candidate rows (or grid blocks / rectangles) evaluated by the search.
+        intercepts_computed (int): Scanlines computed (intercept cache misses).
+        cache_hits (int): Scanlines served by the intercept cache.
+        rescale_iterations (int): Extra searches made while rescaling the sequence.
+        final_scale (float): Scale of the placed sequence (None if nothing was placed).
+        placement_cache_hit (bool): True if the result came from the persistent placement cache.
+        phase_times (dict): Wall time in seconds of each phase ('context', 'search', 'layout', ...).
+    """
+
+    COUNTERS = ('segments', 'y_candidates', 'intercepts_computed', 'cache_hits', 'rescale_iterations')
+
+    def __init__(self):
+        self.segments = 0
+        self.y_candidates = 0
+        self.intercepts_computed = 0
+        self.cache_hits = 0
+        self.rescale_iterations = 0
+        self.final_scale = None
+        self.placement_cache_hit = False
+        self.phase_times = {}
+
+    def __repr__(self):
+        counters = ', '.join(f"{name}={getattr(self, name)}" for name in self.COUNTERS)
+        return f"PlacementStats({counters}, total_time={self.total_time:.4f})"
+
+    @property
+    def total_time(self):
+        """Sum of the phase times, in seconds."""
+        return sum(self.phase_times.values())
+
+    @contextmanager
+    def phase(self, name):
+        """Adds the wall time of the with block to the given phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + time.perf_counter() - start
+
+    def as_dict(self):
+        """Plain dict of the counters and timings (JSON serializable)."""
+        result = {name: getattr(self, name) for name in self.COUNTERS}
+        result['final_scale'] = self.final_scale
+        result['placement_cache_hit'] = self.placement_cache_hit
+        result['phase_times'] = dict(self.phase_times)
+        result['total_time'] = self.total_time
+        return result
@@ -0,0 +1,343 @@
+"""
+Tessellation of DXF entities into segments.
+
+The number of chords of a circle or arc is chosen from a max chord error (the
+distance between a chord and the curve it replaces), so accuracy and segment
+count follow the radius instead of a fixed formula. All arcs of a drawing are
+tessellated together in one vectorized pass.
+
+Each DXF type is handled by a tessellator registered with register_tessellator;
+comp_segs_and_limits runs every registered type into one SegmentBuffer.
+"""
+import threading
+import weakref
+
+import numpy as np
+from ezdxf.math import bulge_to_arc
+
+
+# Default max distance between a chord and its arc, in drawing units
+MAX_CHORD_ERROR = 0.1
+
+# Min number of chords of a full circle (arcs get the same density)
+MIN_ARC_SEGS = 8
+
+
+def arc_segment_counts(radii, sweeps, chord_error=MAX_CHORD_ERROR):
+    """
+    Number of chords needed by each arc to stay within the chord error.
+
+    A chord spanning an angle a is at most r * (1 - cos(a / 2)) away from the arc,
+    so the largest allowed angle is 2 * acos(1 - chord_error / r).
+
+    Args:
+        radii: Radius of each arc.
+        sweeps: Swept angle of each arc in radians (2 * pi for a circle).
+        chord_error (float): Max chord error in drawing units.
+
+    Returns:
+        ndarray: Int array with the number of chords of each arc (at least 1).
+
+    Raises:
+        ValueError: If chord_error is not positive.
+    """
+    if not chord_error > 0:
+        raise ValueError(f"chord_error must be positive, got {chord_error}.")
+    radii = np.asarray(radii, dtype=float)
+    sweeps = np.asarray(sweeps, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cos_half = np.clip(1 - chord_error / radii, -1, 1)
+        max_angle = 2 * np.arccos(cos_half)
+        counts = np.ceil(sweeps / max_angle)
+
+    counts = np.where(np.isfinite(counts), counts, 1)
+    minimum = np.ceil(MIN_ARC_SEGS * sweeps / (2 * np.pi))
+    return np.maximum(np.maximum(counts, minimum), 1).astype(np.int64)
+
+
+def tessellate_arcs(centers_x, centers_y, radii, start_angles, sweeps, closed=None,
+                    chord_error=MAX_CHORD_ERROR):
+    """
+    Converts a batch of arcs to chords in one vectorized pass.
+
+    Args:
+        centers_x, centers_y: Center of each arc.
+        radii: Radius of each arc.
+        start_angles: Start angle of each arc in radians.
+        sweeps: Counter-clockwise swept angle of each arc in radians.
+        closed: Boolean per arc, True for full circles: the last chord then ends
+            exactly on the first point (default: all False).
+        chord_error (float): Max chord error in drawing units.
+
+    Returns:
+        ndarray: (N, 4) float array of (start_x, start_y, end_x, end_y) chords, arc after arc.
+    """
+    centers_x = np.asarray(centers_x, dtype=float).reshape(-1)
+    centers_y = np.asarray(centers_y, dtype=float).reshape(-1)
+    radii = np.asarray(radii, dtype=float).reshape(-1)
+    start_angles = np.asarray(start_angles, dtype=float).reshape(-1)
+    sweeps = np.asarray(sweeps, dtype=float).reshape(-1)
+    closed = np.zeros(len(radii), dtype=bool) if closed is None else np.asarray(closed, dtype=bool).reshape(-1)
+
+    if len(radii) == 0:
+        return np.empty((0, 4), dtype=float)
+
+    counts = arc_segment_counts(radii, sweeps, chord_error)
+
+    # Vertices: counts + 1 per arc, k = position of the vertex inside its arc
+    n_vertices = counts + 1
+    arc_of_vertex = np.repeat(np.arange(len(radii)), n_vertices)
+    first_vertex = np.cumsum(n_vertices) - n_vertices
+    k = np.arange(len(arc_of_vertex)) - first_vertex[arc_of_vertex]
+
+    angles = start_angles[arc_of_vertex] + sweeps[arc_of_vertex] * (k / counts[arc_of_vertex])
+    # Circles end on their first point exactly
+    last_of_circle = closed[arc_of_vertex] & (k == counts[arc_of_vertex])
+    angles[last_of_circle] = start_angles[arc_of_vertex[last_of_circle]]
+
+    x = centers_x[arc_of_vertex] + radii[arc_of_vertex] * np.cos(angles)
+    y = centers_y[arc_of_vertex] + radii[arc_of_vertex] * np.sin(angles)
+
+    # Chord j of arc i goes from vertex first_vertex[i] + j to the next one
+    seg_start = np.repeat(first_vertex, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+    return np.column_stack((x[seg_start], y[seg_start], x[seg_start + 1], y[seg_start + 1]))
+
+
+######################################################################################################################
+# Tessellators registry
+
+class SegmentBuffer:
+    """
+    Growable preallocated (N, 4) coordinate buffer shared by the tessellators.
+
+    Straight segments are written in place; circles and arcs are only recorded and
+    tessellated all together by to_array(), so they keep the vectorized pass.
+    """
+
+    def __init__(self, capacity=1024):
+        self._data = np.empty((max(1, capacity), 4), dtype=float)
+        self._size = 0
+        self._arcs = []
+        self.is_2d = True
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed > len(self._data):
+            grown = np.empty((max(needed, 2 * len(self._data)), 4), dtype=float)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+    def append(self, start_x, start_y, end_x, end_y):
+        """Writes one segment."""
+        self._reserve(1)
+        self._data[self._size] = (start_x, start_y, end_x, end_y)
+        self._size += 1
+
+    def extend(self, segs):
+        """Writes an (N, 4) array of segments."""
+        segs = np.asarray(segs, dtype=float).reshape(-1, 4)
+        self._reserve(len(segs))
+        self._data[self._size:self._size + len(segs)] = segs
+        self._size += len(segs)
+
+    def add_polyline(self, points, closed=False):
+        """Writes the segments joining consecutive (K, 2) points (and the last to the first if closed)."""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if closed and len(points) > 2:
+            points = np.vstack([points, points[:1]])
+        if len(points) >= 2:
+            self.extend(np.hstack([points[:-1], points[1:]]))
+
+    def add_arc(self, center_x, center_y, radius, start_angle, sweep, closed=False):
+        """Records a counter-clockwise arc (angles in radians), tessellated by to_array()."""
+        self._arcs.append((center_x, center_y, radius, start_angle, sweep, closed))
+
+    def to_array(self, chord_error=MAX_CHORD_ERROR):
+        """Returns all segments as an (N, 4) array, arcs first."""
+        if self._arcs:
+            centers_x, centers_y, radii, start_angles, sweeps, closed = zip(*self._arcs)
+            arcs = tessellate_arcs(centers_x, centers_y, radii, start_angles, sweeps, closed, chord_error)
+        else:
+            arcs = np.empty((0, 4), dtype=float)
+        return np.concatenate([arcs, self._data[:self._size]])
+
+
+# DXF type -> (tessellator, cached)
+TESSELLATORS = {}
+
+
+def register_tessellator(*dxftypes, cached=False):
+    """
+    Registers a tessellator for one or more DXF types.
+
+    A tessellator is called as func(entity, buffer, chord_error): it writes the
+    segments of the entity into the SegmentBuffer and sets buffer.is_2d to False
+    when the entity is not flat. Tessellators registered with cached=True are only
+    run once per entity handle and geometry (see FlatteningCache).
+
+    Example:
+        >>> @register_tessellator('POINT')
+        ... def tessellate_point(entity, buffer, chord_error):
+        ...     ...
+    """
+    def decorator(func):
+        for dxftype in dxftypes:
+            TESSELLATORS[dxftype.upper()] = (func, cached)
+        return func
+    return decorator
+
+
+def tessellate_entity(entity, buffer, chord_error=MAX_CHORD_ERROR, cache=None):
+    """
+    Writes the segments of an entity into the buffer with its registered tessellator.
+
+    Returns:
+        bool: False if no tessellator is registered for the entity type.
+    """
+    entry = TESSELLATORS.get(entity.dxftype())
+    if entry is None:
+        return False
+    func, cached = entry
+    if not cached:
+        func(entity, buffer, chord_error)
+        return True
+
+    cache = flattening_cache if cache is None else cache
+    hit = cache.get(entity, chord_error)
+    if hit is None:
+        own = SegmentBuffer(64)
+        func(entity, own, chord_error)
+        hit = (own.to_array(chord_error), own.is_2d)
+        cache.put(entity, chord_error, hit)
+    segs, is_2d = hit
+    buffer.extend(segs)
+    buffer.is_2d &= is_2d
+    return True
+
+
+@register_tessellator('LINE')
+def tessellate_line(entity, buffer, chord_error):
+    start_point = entity.dxf.start
+    end_point = entity.dxf.end
+    buffer.append(start_point.x, start_point.y, end_point.x, end_point.y)
+    if start_point.z != 0 or end_point.z != 0:
+        buffer.is_2d = False
+
+
+@register_tessellator('LWPOLYLINE')
+def tessellate_lwpolyline(entity, buffer, chord_error):
+    points = entity.get_points('xyb')
+    if len(points) < 2:
+        return
+    if entity.closed:
+        points = list(points) + [points[0]]
+
+    start = 0
+    for i in range(len(points) - 1):
+        x1, y1, bulge = points[i]
+        x2, y2, _ = points[i + 1]
+        if bulge == 0 or (x1, y1) == (x2, y2):
+            continue
+        # Straight run before the bulged span, then the arc itself
+        buffer.add_polyline([p[:2] for p in points[start:i + 1]])
+        center, start_angle, end_angle, radius = bulge_to_arc((x1, y1), (x2, y2), bulge)
+        buffer.add_arc(center.x, center.y, radius, start_angle, (end_angle - start_angle) % (2 * np.pi))
+        start = i + 1
+    buffer.add_polyline([p[:2] for p in points[start:]])
+
+
+@register_tessellator('CIRCLE')
+def tessellate_circle(entity, buffer, chord_error):
+    center = entity.dxf.center
+    if center.z != 0:
+        buffer.is_2d = False
+    buffer.add_arc(center.x, center.y, entity.dxf.radius, 0.0, 2 * np.pi, closed=True)
+
+
+@register_tessellator('ARC')
+def tessellate_arc(entity, buffer, chord_error):
+    center = entity.dxf.center
+    if center.z != 0:
+        buffer.is_2d = False
+    start_angle = np.radians(entity.dxf.start_angle)
+    final_angle = np.radians(entity.dxf.end_angle)
+    if start_angle > final_angle:
+        final_angle += 2 * np.pi
+    buffer.add_arc(center.x, center.y, entity.dxf.radius, start_angle, final_angle - start_angle)
+
+
+@register_tessellator('SPLINE', 'ELLIPSE', cached=True)
+def tessellate_flattening(entity, buffer, chord_error):
+    """Curves flattened by ezdxf within the chord error."""
+    points = np.array([(p.x, p.y, p.z) for p in entity.flattening(chord_error)], dtype=float)
+    if len(points) < 2:
+        return
+    if np.any(points[:, 2] != 0):
+        buffer.is_2d = False
+    buffer.add_polyline(points[:, :2])
+
+
+######################################################################################################################
+# Flattening cache
+
+class FlatteningCache:
+    """
+    Segments of already flattened entities, per document and entity handle.
+
+    Entries are checked against a fingerprint of the entity geometry, so an entity
+    edited between two operations is flattened again. Documents are held weakly:
+    their entries go away with them.
+    """
+
+    def __init__(self):
+        self._docs = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(entity, chord_error):
+        """Hash of the entity geometry and the chord error."""
+        attribs = sorted((key, str(value)) for key, value in entity.dxf.all_existing_dxf_attribs().items())
+        extra = ()
+        if entity.dxftype() == 'SPLINE':
+            extra = (tuple(map(tuple, entity.control_points)), tuple(map(tuple, entity.fit_points)),
+                     tuple(entity.knots), tuple(entity.weights))
+        return hash((tuple(attribs), extra, chord_error))
+
+    def _entries(self, entity):
+        doc = entity.doc
+        if doc is None:
+            return None
+        return self._docs.setdefault(doc, {})
+
+    def get(self, entity, chord_error):
+        """Returns the cached (segs, is_2d) of the entity, or None."""
+        with self._lock:
+            entries = self._entries(entity)
+            entry = entries.get(entity.dxf.handle) if entries is not None else None
+            if entry is not None and entry[0] == self.fingerprint(entity, chord_error):
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, entity, chord_error, result):
+        with self._lock:
+            entries = self._entries(entity)
+            if entries is not None:
+                entries[entity.dxf.handle] = (self.fingerprint(entity, chord_error), result)
+
+    def clear(self):
+        with self._lock:
+            self._docs.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared by every operation working on the same documents
+flattening_cache = FlatteningCache()
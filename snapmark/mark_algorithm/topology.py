@@ -0,0 +1,232 @@
+"""
+Contour topology of a drawing.
+
+The segments from comp_segs_and_limits are chained into loops by hashing their
+end points on a tolerance grid. Closed loops are classified as outer profiles
+or inner cutouts from their nesting depth, and every contour keeps its bounding
+box, so queries about a candidate rectangle only look at the contours that can
+actually reach it.
+"""
+import numpy as np
+
+from snapmark.mark_algorithm.spatial import segments_intersect_rect
+
+
+# Default distance under which two end points are considered the same vertex
+DEFAULT_TOLERANCE = 1e-4
+
+
+def points_in_polygon(x, y, points):
+    """Even-odd test of the points (x, y) against a closed polygon given as a (K, 2) vertex array."""
+    x = np.atleast_1d(np.asarray(x, dtype=float))[:, None]
+    y = np.atleast_1d(np.asarray(y, dtype=float))[:, None]
+    x1, y1 = points[:, 0], points[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crosses = ((y1 > y) != (y2 > y)) & (x < (x2 - x1) * (y - y1) / (y2 - y1) + x1)
+    return crosses.sum(axis=1) % 2 == 1
+
+
+class Contour:
+    """A chain of connected segments, closed (loop) or open."""
+
+    def __init__(self, points, closed, segment_ids):
+        """
+        Args:
+            points: (K, 2) array of the vertices in walking order (not repeating the first one).
+            closed (bool): True if the chain returns to its first vertex.
+            segment_ids: Ids of the source segments, in walking order.
+        """
+        self.points = points
+        self.closed = closed
+        self.segment_ids = np.asarray(segment_ids, dtype=np.intp)
+        self.bbox = (*points.min(axis=0), *points.max(axis=0))
+        self.depth = 0
+
+        x, y = points[:, 0], points[:, 1]
+        self.area = 0.5 * float(np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)) if closed else 0.0
+
+    def __repr__(self):
+        kind = 'outer' if self.is_outer else 'inner' if self.closed else 'open'
+        return f"Contour({kind}, {len(self.points)} vertices, bbox={tuple(round(float(v), 3) for v in self.bbox)})"
+
+    @property
+    def is_outer(self):
+        """True for closed loops at even nesting depth (outer profiles)."""
+        return self.closed and self.depth % 2 == 0
+
+    @property
+    def is_inner(self):
+        """True for closed loops at odd nesting depth (cutouts / holes)."""
+        return self.closed and self.depth % 2 == 1
+
+    def contains(self, x, y):
+        """Even-odd test of points against the loop (always False for open chains)."""
+        if not self.closed:
+            return np.zeros(np.size(x), dtype=bool)
+        return points_in_polygon(x, y, self.points)
+
+
+class ContourTopology:
+    """
+    Contours of a drawing with their nesting and bounding boxes.
+
+    Example:
+        >>> topology = ContourTopology(segs)
+        >>> topology.outer, topology.inner, topology.open
+        >>> topology.rect_is_clear(10, 10, 60, 25)
+    """
+
+    def __init__(self, segs, tolerance=DEFAULT_TOLERANCE):
+        """
+        Chains the segments into contours and classifies the closed ones.
+
+        Args:
+            segs: (N, 4) array of segments.
+            tolerance (float): End points closer than this are merged into one vertex.
+        """
+        self.segs = np.asarray(segs, dtype=float).reshape(-1, 4)
+        self.tolerance = tolerance
+        self.contours = self._chain()
+        self.bboxes = np.array([c.bbox for c in self.contours], dtype=float).reshape(-1, 4)
+        self._classify()
+
+    @property
+    def closed(self):
+        return [c for c in self.contours if c.closed]
+
+    @property
+    def outer(self):
+        return [c for c in self.contours if c.is_outer]
+
+    @property
+    def inner(self):
+        return [c for c in self.contours if c.is_inner]
+
+    @property
+    def open(self):
+        return [c for c in self.contours if not c.closed]
+
+    def _chain(self):
+        """Walks the segments from vertex to vertex to build the contours."""
+        if len(self.segs) == 0:
+            return []
+
+        # Tolerant end point hashing: every end point is snapped on the tolerance grid
+        ends = self.segs.reshape(-1, 2)
+        keys = np.round(ends / self.tolerance).astype(np.int64)
+        _, node = np.unique(keys, axis=0, return_inverse=True)
+        node = node.reshape(-1)
+        # Coordinates of a vertex: the first end point snapped on it
+        first_end = np.empty(node.max() + 1, dtype=np.intp)
+        first_end[node[::-1]] = np.arange(len(node))[::-1]
+        node = node.reshape(-1, 2)
+
+        adjacency = {}
+        for seg_id, (a, b) in enumerate(node.tolist()):
+            if a == b:
+                continue  # Degenerate segment
+            adjacency.setdefault(a, []).append((seg_id, b))
+            adjacency.setdefault(b, []).append((seg_id, a))
+
+        used = np.zeros(len(self.segs), dtype=bool)
+        used[node[:, 0] == node[:, 1]] = True
+
+        def walk(start, stop):
+            """Follows unused segments from start until stop or a dead end, returns (vertices, segment ids)."""
+            vertices, seg_ids, current = [], [], start
+            while True:
+                step = next(((s, other) for s, other in adjacency.get(current, ()) if not used[s]), None)
+                if step is None:
+                    return vertices, seg_ids
+                used[step[0]] = True
+                seg_ids.append(step[0])
+                vertices.append(step[1])
+                current = step[1]
+                if current == stop:
+                    return vertices, seg_ids
+
+        contours = []
+        for seg_id in range(len(self.segs)):
+            if used[seg_id]:
+                continue
+            used[seg_id] = True
+            first, last = node[seg_id].tolist()
+            forward, forward_ids = walk(last, first)
+            closed = bool(forward) and forward[-1] == first
+            if closed:
+                vertices, seg_ids = [first, last] + forward[:-1], [seg_id] + forward_ids
+            else:
+                backward, backward_ids = walk(first, last)
+                vertices = backward[::-1] + [first, last] + forward
+                seg_ids = backward_ids[::-1] + [seg_id] + forward_ids
+
+            contours.append(Contour(ends[first_end[vertices]], closed, seg_ids))
+
+        return contours
+
+    def _classify(self, chunk=1024):
+        """
+        Sets the nesting depth of every closed loop (number of loops containing it).
+
+        The bounding boxes prune the pairs in one array comparison per chunk of loops, then
+        every container tests all its remaining candidate points with one polygon query.
+        """
+        closed = self.closed
+        if not closed:
+            return
+        # Midpoint of the first edge: never a vertex shared with another loop
+        points = np.array([(c.points[0] + c.points[1 % len(c.points)]) / 2 for c in closed])
+        bboxes = np.array([c.bbox for c in closed], dtype=float)
+        depth = np.zeros(len(closed), dtype=np.intp)
+
+        for start in range(0, len(closed), chunk):
+            x = points[start:start + chunk, 0][:, None]
+            y = points[start:start + chunk, 1][:, None]
+            hit = (bboxes[:, 0] <= x) & (x <= bboxes[:, 2]) & (bboxes[:, 1] <= y) & (y <= bboxes[:, 3])
+            point_ids, container_ids = np.nonzero(hit)
+            point_ids = point_ids + start
+            keep = point_ids != container_ids
+            point_ids, container_ids = point_ids[keep], container_ids[keep]
+
+            if len(container_ids) == 0:
+                continue
+
+            # One polygon query per container, with all the points its bounding box holds
+            order = np.argsort(container_ids, kind='stable')
+            point_ids, container_ids = point_ids[order], container_ids[order]
+            bounds = np.flatnonzero(np.diff(container_ids)) + 1
+            for ids, container in zip(np.split(point_ids, bounds), container_ids[np.r_[0, bounds]].tolist()):
+                inside = points_in_polygon(points[ids, 0], points[ids, 1], closed[container].points)
+                np.add.at(depth, ids[inside], 1)
+
+        for loop, d in zip(closed, depth.tolist()):
+            loop.depth = d
+
+    def candidates(self, x_min, y_min, x_max, y_max):
+        """Contours whose bounding box overlaps the rectangle (all others cannot intersect it)."""
+        b = self.bboxes
+        hit = (b[:, 0] <= x_max) & (b[:, 2] >= x_min) & (b[:, 1] <= y_max) & (b[:, 3] >= y_min)
+        return [self.contours[i] for i in np.nonzero(hit)[0]]
+
+    def is_material(self, x, y):
+        """True if the point is inside an outer profile and outside its cutouts (even-odd on closed loops)."""
+        inside = sum(1 for c in self.candidates(x, y, x, y) if c.closed and c.contains(x, y)[0])
+        return inside % 2 == 1
+
+    def rect_is_clear(self, x_min, y_min, x_max, y_max):
+        """
+        True if the rectangle lies in the material and no contour crosses it.
+
+        Only the contours whose bounding box overlaps the rectangle are tested.
+        """
+        for contour in self.candidates(x_min, y_min, x_max, y_max):
+            if segments_intersect_rect(self.segs[contour.segment_ids], x_min, y_min, x_max, y_max).any():
+                return False
+        return self.is_material((x_min + x_max) / 2, (y_min + y_max) / 2)
+
+    def closed_segments(self):
+        """Segments belonging to closed loops only (open chains removed)."""
+        ids = [c.segment_ids for c in self.contours if c.closed]
+        return self.segs[np.concatenate(ids)] if ids else self.segs[:0]
@@ -1,6 +1,6 @@
 
 import os
-import ezdxf
+import copy
 from abc import ABC, abstractmethod
 from pathlib import Path
 
@@ -13,7 +13,13 @@ except ImportError:
 from snapmark.mark_algorithm.mark_algorithm import *
 from snapmark.entities.add_entities import *
 from snapmark.checking.checking import *
-from snapmark.utils.helpers import find_dxf_files
+from snapmark.utils.helpers import iter_dxf_files
+from snapmark.utils.dxf_io import read_dxf, save_atomic, discard_output
+from snapmark.utils.parallel import OperationJob, run_in_pool, merge_result, resolve_workers
+from snapmark.utils.placement_cache import PlacementCache
+from snapmark.mark_algorithm.stats import PlacementStats
+from snapmark.mark_algorithm.scanline import DEFAULT_CACHE_SIZE
+from snapmark.mark_algorithm.tessellation import MAX_CHORD_ERROR
 from snapmark.utils.messages import (
     file_in_use_error, file_not_found_error, 
     cannot_open_error, cannot_save_error,
@@ -24,6 +30,9 @@ from snapmark.utils.messages import (
 class Operation(ABC):
     """Base class for all operations on DXF files."""
     
+    # Attributes holding the results of the last file, left out of the pipeline fingerprint
+    RESULT_ATTRIBUTES = ('message_text',)
+    
     def __init__(self):
         self.create_new = True 
         self.message_text = None
@@ -40,6 +49,33 @@ class Operation(ABC):
             print(self.message_text)
         else:
             print(f"Operation complete on {file_name}")
+
+    def copy_for_worker(self):
+        """
+        Returns the copy of the operation used by a pool worker for one file.
+
+        The copy is shallow: attributes assigned while processing the file (messages, results,
+        counters) stay on the copy, but nested objects (lists, child operations) are shared with
+        the original. Operations that keep results inside nested objects override this method
+        to copy them (see AddMarks).
+        """
+        return copy.copy(self)
+
+    def merge(self, other):
+        """Merges the results of a worker copy into this operation (nothing to merge by default)."""
+        pass
+
+    def running_total(self):
+        """
+        Returns the number the operation accumulates over the files (e.g. a Counter total),
+        or None if it keeps none. Incremental runs store the share of every file and add it
+        back with add_to_total() when the file is skipped.
+        """
+        return None
+
+    def add_to_total(self, quantity):
+        """Adds the stored share of a skipped file to the running total (nothing by default)."""
+        pass
     
     def execute_single(self, file_path: str, use_backup: bool = True) -> bool:
         """
@@ -61,10 +97,11 @@ class Operation(ABC):
                 print(file_not_found_error(file_name))
                 return False
             
-            # Backup handling
+            # Backup handling: on re-runs the original is parsed straight from the backup
+            source = file_path
             if use_backup and BACKUP_AVAILABLE:
                 try:
-                    BackupManager.ensure_original(file_path)
+                    source = BackupManager.ensure_backup(file_path)
                 except PermissionError:
                     print(file_in_use_error(file_name))
                     return False
@@ -77,7 +114,7 @@ class Operation(ABC):
             
             # Open the file - THIS IS WHERE IT FAILS IF FILE IS OPEN
             try:
-                doc = ezdxf.readfile(file_path)
+                doc = read_dxf(source, file_path)
             except PermissionError:
                 print(file_in_use_error(file_name))
                 return False
@@ -90,12 +127,13 @@ class Operation(ABC):
                 modified = self.execute(doc, folder, file_name)
             except Exception as e:
                 print(processing_error(file_name, str(e)))
+                discard_output(file_path, source)
                 return False
             
-            # Save if modified
+            # Save if modified: the output replaces the file in one atomic write
             if modified:
                 try:
-                    doc.saveas(file_path)
+                    save_atomic(doc, file_path)
                     self.message(file_name)
                     return True
                 except PermissionError:
@@ -103,8 +141,10 @@ class Operation(ABC):
                     return False
                 except Exception as e:
                     print(cannot_save_error(file_name, str(e)))
+                    discard_output(file_path, source)
                     return False
             
+            discard_output(file_path, source)
             return False
             
         except Exception as e:
@@ -115,18 +155,53 @@ class Operation(ABC):
     @classmethod
     def process_folder(cls, folder_path: str, operation_instance: 'Operation', 
                       use_backup: bool = True, recursive: bool = False,
-                      file_pattern: str = "*.dxf") -> dict:
-        """Static method to apply an operation to all DXF files in a folder."""
+                      file_pattern: str = "*.dxf", workers: int = None,
+                      backend: str = 'thread', min_size: int = None, max_size: int = None,
+                      exclude=None) -> dict:
+        """
+        Static method to apply an operation to all DXF files in a folder.
+        Files are processed while the folder is walked (with workers, once it is listed).
+
+        Args:
+            folder_path: Path of the folder.
+            operation_instance: Instance of the operation to apply.
+            use_backup: If True, uses BackupManager to preserve the originals.
+            recursive: If True, processes subfolders as well.
+            file_pattern: Glob or compiled regex the file names must match (default: "*.dxf").
+            workers: Number of files processed concurrently (None or 1: one at a time, 0: one per CPU core).
+            backend: Pool of the workers, 'thread' (default) or 'process' (the operation must be picklable).
+                Worker results are merged back into operation_instance in file order.
+            min_size: Skips files smaller than this many bytes.
+            max_size: Skips files larger than this many bytes.
+            exclude: Globs or regexes of files and subfolders to skip (see iter_dxf_files).
+
+        Returns:
+            dict: Statistics containing {'processed': int, 'modified': int, 'errors': int}.
+        """
         stats = {
             'processed': 0,
             'modified': 0,
             'errors': 0
         }
 
-        dxf_files = find_dxf_files(folder_path, recursive=recursive)
-        
-        for file_path in dxf_files:
-            success = operation_instance.execute_single(str(file_path), use_backup=use_backup)
+        dxf_files = iter_dxf_files(folder_path, file_pattern, recursive, min_size, max_size, exclude)
+        file_paths = (str(file_path) for file_path in dxf_files)
+
+        workers = resolve_workers(workers)
+        if workers > 1:
+            # A pool splits a known list of files
+            file_paths = list(file_paths)
+            workers = min(workers, len(file_paths))
+            if file_paths:
+                print(f"🔧 Found {len(file_paths)} file(s) to process in {folder_path}")
+
+        if workers > 1:
+            results = cls._execute_in_pool(operation_instance, file_paths, use_backup, workers, backend)
+        else:
+            results = (operation_instance.execute_single(file_path, use_backup=use_backup)
+                       for file_path in file_paths)
+
+        for success in results:
             if success:
                 stats['processed'] += 1
                 stats['modified'] += 1
@@ -143,17 +218,34 @@ class Operation(ABC):
         
         return stats
 
+    @staticmethod
+    def _execute_in_pool(operation_instance, file_paths, use_backup, workers, backend):
+        """Runs execute_single on worker copies of the operation, yielding the successes in file order."""
+        print(f"🔧 Processing with {workers} {backend} workers")
+        job = OperationJob(operation_instance, use_backup)
+        for result in run_in_pool(job, file_paths, workers, backend):
+            merge_result([operation_instance], result)
+            yield result.success
+
 
 # ========== CONCRETE IMPLEMENTATIONS (unchanged) ==========
 
 class AddMark(Operation):
     """Aggiunge marcatura numerica ai file DXF."""
     
+    RESULT_ATTRIBUTES = Operation.RESULT_ATTRIBUTES + ('sequence_position', 'placement_stats')
+    
     def __init__(self, sequence, scale_factor=50, space=1.5, min_char=5,
                  max_char=20, arbitrary_x=None, arbitrary_y=None, align='c',
                  start_y=1, step=2, margin=1, down_to=None, mark_layer='MARK', 
-                 excluded_layers=None):
+                 excluded_layers=None, cache_size=DEFAULT_CACHE_SIZE, rescale_tolerance=0.5,
+                 method='scanline', raster_resolution=None, chord_error=MAX_CHORD_ERROR,
+                 placement_cache=None, mark_entity='LINE', priority=0):
         super().__init__()
+        if not rescale_tolerance > 0:
+            raise ValueError(f"rescale_tolerance must be positive, got {rescale_tolerance}.")
+        if not chord_error > 0:
+            raise ValueError(f"chord_error must be positive, got {chord_error}.")
         self.sequence = sequence
         self.scale_factor = scale_factor
         self.space = space
@@ -168,24 +260,58 @@ class AddMark(Operation):
         self.down_to = down_to
         self.layer = mark_layer
         self.excluded_layers = excluded_layers
+        self.cache_size = cache_size
+        self.rescale_tolerance = rescale_tolerance
+        self.method = method
+        self.raster_resolution = raster_resolution
+        self.chord_error = chord_error
+        # A path opens a persistent placement cache, an existing PlacementCache is shared as is
+        if isinstance(placement_cache, (str, os.PathLike)):
+            placement_cache = PlacementCache(placement_cache)
+        self.placement_cache = placement_cache
+        self.mark_entity = mark_entity
+        # Placement order inside AddMarks: higher priority labels are placed first
+        self.priority = priority
         self.sequence_position = NS()
+        # Counters and phase timings of the last placement (see PlacementStats)
+        self.placement_stats = None
 
     def __repr__(self):
         return f"AddMark(sequence={self.sequence})"
 
-    def execute(self, doc, folder, file_name):
-        """Legacy method - maintains original logic for compatibility."""
+    def place(self, doc, folder, file_name, context=None, stats=None):
+        """
+        Computes the position of the sequence without adding it to the document.
+
+        Args:
+            doc: The document to mark.
+            folder: Folder of the file (used by the sequence).
+            file_name: Name of the file (used by the sequence).
+            context (PlacementContext, optional): Shared geometry of doc (built when None).
+            stats (PlacementStats, optional): Filled with the counters of the placement.
+
+        Returns:
+            NS: The placed sequence (empty if no space was found).
+        """
         scale_factor = comp_sf(doc, self.scale_factor)
         sequence = self.sequence.get_sequence_text(folder, file_name)
         
-        start_x, start_y = comp_center_point((doc))
-        self.sequence_position = place_sequence(
+        # Placement state is local to this call: the same AddMark can run on several threads
+        return place_sequence(
             doc, sequence, scale_factor, self.excluded_layers, self.space, 
             self.min_char, self.max_char, self.arbitrary_x, self.arbitrary_y, 
-            self.align, self.start_y, self.step, self.margin, self.down_to
+            self.align, self.start_y, self.step, self.margin, self.down_to,
+            self.cache_size, self.rescale_tolerance, self.method, self.raster_resolution,
+            self.chord_error, self.placement_cache, context, stats
         )
 
-        add_numbers_to_layer(doc, self.sequence_position, self.layer)
+    def execute(self, doc, folder, file_name):
+        """Legacy method - maintains original logic for compatibility."""
+        placement_stats = PlacementStats()
+        sequence_position = self.place(doc, folder, file_name, stats=placement_stats)
+        add_numbers_to_layer(doc, sequence_position, self.layer, self.mark_entity)
+        self.sequence_position = sequence_position
+        self.placement_stats = placement_stats
         return self.create_new
                      
     def message(self, file_name):
@@ -196,6 +322,98 @@ class AddMark(Operation):
         print(self.message_text)
 
 
+class AddMarks(Operation):
+    """
+    Adds several labels (e.g. part number, job number, quantity) to the same file in one pass.
+
+    The drawing is tessellated and indexed once per distinct excluded_layers/chord_error of the
+    labels (once when they all share the container's settings); labels are placed by decreasing
+    priority and every placed label becomes an obstacle for the next ones in every geometry, so
+    they never overlap.
+    """
+
+    RESULT_ATTRIBUTES = Operation.RESULT_ATTRIBUTES + ('placements', 'placement_stats')
+
+    def __init__(self, marks, excluded_layers=None, cache_size=DEFAULT_CACHE_SIZE, chord_error=MAX_CHORD_ERROR,
+                 **kwargs):
+        """
+        Args:
+            marks: List of labels. Each one is an AddMark, a sequence, or a (sequence, priority) pair;
+                sequences are wrapped in AddMark(sequence, **kwargs).
+            excluded_layers: Layers skipped by the labels given as sequences. An AddMark keeps its own.
+            cache_size (int): Max number of scanlines kept in the intercept cache of each geometry.
+            chord_error (float): Max chord error of the labels given as sequences. An AddMark keeps its own.
+            **kwargs: Other AddMark parameters used for the labels given as sequences.
+        """
+        super().__init__()
+        self.excluded_layers = excluded_layers
+        self.cache_size = cache_size
+        self.chord_error = chord_error
+        self.marks = []
+        for mark in marks:
+            if not isinstance(mark, AddMark):
+                sequence, priority = mark if isinstance(mark, tuple) else (mark, 0)
+                mark = AddMark(sequence, excluded_layers=excluded_layers, cache_size=cache_size,
+                               chord_error=chord_error, priority=priority, **kwargs)
+            self.marks.append(mark)
+        # Stable sort: labels with the same priority keep the given order
+        self.marks.sort(key=lambda mark: -mark.priority)
+        # (mark, placed sequence, PlacementStats) of the last file, in placement order
+        self.placements = []
+        # One PlacementStats per label of the last file, in placement order
+        self.placement_stats = None
+
+    def __repr__(self):
+        return f"AddMarks(marks={self.marks})"
+
+    def copy_for_worker(self):
+        """Worker copy with its own AddMark copies, so files never share label results."""
+        worker = super().copy_for_worker()
+        worker.marks = [mark.copy_for_worker() for mark in self.marks]
+        return worker
+
+    def execute(self, doc, folder, file_name):
+        # One geometry per distinct excluded_layers/chord_error, with the labels placed so far as obstacles
+        contexts = {}
+        obstacles = []
+
+        # Results stay local to this call: the marks are settings shared by every file
+        placements = []
+        for mark in self.marks:
+            stats = PlacementStats()
+            key = (tuple(mark.excluded_layers or ()), mark.chord_error)
+            context = contexts.get(key)
+            if context is None:
+                context = contexts[key] = PlacementContext(doc, mark.excluded_layers, self.cache_size, mark.chord_error)
+                # A geometry is built once, its cost goes to the first label using it
+                stats.phase_times.update(context.stats.phase_times)
+                for obstacle in obstacles:
+                    context.add_obstacle(*obstacle)
+            sequence_position = mark.place(doc, folder, file_name, context, stats)
+            placements.append((mark, sequence_position, stats))
+            bounds = sequence_bounds(sequence_position)
+            if bounds is not None:
+                min_x, min_y, max_x, max_y = bounds
+                obstacles.append((min_x - mark.margin, min_y - mark.margin, max_x + mark.margin, max_y + mark.margin))
+                for other in contexts.values():
+                    other.add_obstacle(*obstacles[-1])
+
+        # Labels are written at the end: the shared geometry only holds the drawing and the obstacles
+        for mark, sequence_position, _ in placements:
+            add_numbers_to_layer(doc, sequence_position, mark.layer, mark.mark_entity)
+        self.placements = placements
+        self.placement_stats = [stats for _, _, stats in placements]
+        return self.create_new
+
+    def message(self, file_name):
+        placed = sum(1 for _, sequence_position, _ in self.placements if len(sequence_position.sequence) > 0)
+        if placed < len(self.marks):
+            self.message_text = f"⚠ {placed}/{len(self.marks)} sequences added to {file_name}, no space for the others."
+        else:
+            self.message_text = f"✓ {placed} sequences added to {file_name}"
+        print(self.message_text)
+
+
 class SubstituteCircle(Operation):
     """Replaces existing circles with new circles of a different radius."""
     
@@ -8,6 +8,8 @@ from snapmark.operations.basic_operations import Operation
 class Counter(Operation):
     """Base class for counting operations."""
     
+    RESULT_ATTRIBUTES = Operation.RESULT_ATTRIBUTES + ('counter', 'is_processing_folder')
+    
     def __init__(self):
         """Initializes the Counter with a counter set to zero and processing flags."""
         super().__init__()
@@ -27,6 +29,22 @@ class Counter(Operation):
     def add_to_counter(self, quantity):
         """Increments the counter by the specified quantity."""
         self.counter += quantity
+
+    def copy_for_worker(self):
+        """Worker copy counting from zero, so its total can be merged back."""
+        worker = super().copy_for_worker()
+        worker.counter = 0
+        return worker
+
+    def merge(self, other):
+        """Reduce step: adds the count of a worker copy to this counter."""
+        self.add_to_counter(other.counter)
+
+    def running_total(self):
+        return self.counter
+
+    def add_to_total(self, quantity):
+        self.add_to_counter(quantity)
     
     def count_message(self):
         """Final message with the total count. To be implemented in subclasses."""
@@ -52,7 +70,9 @@ class Counter(Operation):
     @classmethod
     def process_folder(cls, folder_path: str, operation_instance: 'Counter',
                       use_backup: bool = False, recursive: bool = False,
-                      file_pattern: str = "*.dxf") -> dict:
+                      file_pattern: str = "*.dxf", workers: int = None,
+                      backend: str = 'thread', min_size: int = None, max_size: int = None,
+                      exclude=None) -> dict:
         """
         Overrides for Counter: does not use backup (does not modify files) 
         and adds count_message() at the end.
@@ -62,7 +82,13 @@ class Counter(Operation):
             operation_instance: Instance of the Counter operation to apply.
             use_backup: If True, creates backups (ignored for Counter).
             recursive: If True, processes subfolders as well.
-            file_pattern: Pattern to filter files (default: "*.dxf").
+            file_pattern: Glob or compiled regex the file names must match (default: "*.dxf").
+            workers: Number of files counted concurrently (None or 1: one at a time, 0: one per CPU core).
+            backend: Pool of the workers, 'thread' (default) or 'process'. Every worker counts on
+                its own copy and the totals are merged into operation_instance.
+            min_size: Skips files smaller than this many bytes.
+            max_size: Skips files larger than this many bytes.
+            exclude: Globs or regexes of files and subfolders to skip.
             
         Returns:
             dict: Statistics containing {'processed': int, 'modified': int, 'errors': list}.
@@ -75,7 +101,12 @@ class Counter(Operation):
             folder_path, operation_instance, 
             use_backup=False,  # Counter non modifica mai
             recursive=recursive, 
-            file_pattern=file_pattern
+            file_pattern=file_pattern,
+            workers=workers,
+            backend=backend,
+            min_size=min_size,
+            max_size=max_size,
+            exclude=exclude
         )
         
         # Final message with total count
@@ -109,6 +140,8 @@ class CountFiles(Counter):
 class CountHoles(Counter):
     """Counts holes (circles) in DXF files."""
     
+    RESULT_ATTRIBUTES = Counter.RESULT_ATTRIBUTES + ('holes_count',)
+    
     def __init__(self, find_circle_function, mess=False):
         """
         Initializes the CountHoles operation with the specified parameters.
@@ -6,7 +6,7 @@ from .utils.helpers import find_circle_by_radius
 from .operations.counter import CountHoles, Counter 
 
 
-def mark_by_name(file_or_folder, align='c', min_char=5, max_char=20, start_y=1, **kwargs):
+def mark_by_name(file_or_folder, align='c', min_char=5, max_char=20, start_y=1, workers=None, backend='thread', **kwargs):
     """
     Marks file/folder using the full name of the file.
     
@@ -16,6 +16,8 @@ def mark_by_name(file_or_folder, align='c', min_char=5, max_char=20, start_y=1,
         min_char (float): The minimum height for characters (default is 5).
         max_char (float): The maximum height for characters (default is 20).
         start_y (float): The starting y-coordinate for the search (default is 1).
+        workers (int): Number of files marked concurrently in a folder (default: one at a time).
+        backend (str): Pool of the workers, 'thread' (default) or 'process'.
         **kwargs: Other parameters for AddMark
     """
     import os
@@ -26,10 +28,10 @@ def mark_by_name(file_or_folder, align='c', min_char=5, max_char=20, start_y=1,
     if os.path.isfile(file_or_folder):
         mark_op.execute_single(file_or_folder)
     else:
-        Operation.process_folder(file_or_folder, mark_op)
+        Operation.process_folder(file_or_folder, mark_op, workers=workers, backend=backend)
 
 def mark_by_splitted_text(file_or_folder, separator='_', part_index=0, 
-                      align='c', min_char=5, max_char=20, start_y=1, **kwargs):
+                      align='c', min_char=5, max_char=20, start_y=1, workers=None, backend='thread', **kwargs):
     """
     Marks using a part of the file name (split by separator).
     
@@ -43,6 +45,8 @@ def mark_by_splitted_text(file_or_folder, separator='_', part_index=0,
         min_char (float): The minimum height for characters (default is 5).
         max_char (float): The maximum height for characters (default is 20).
         start_y (float): The starting y-coordinate for the search (default is 1).
+        workers (int): Number of files marked concurrently in a folder (default: one at a time).
+        backend (str): Pool of the workers, 'thread' (default) or 'process'.
         **kwargs: Other parameters for AddMark
     """
     import os
@@ -53,9 +57,10 @@ def mark_by_splitted_text(file_or_folder, separator='_', part_index=0,
     if os.path.isfile(file_or_folder):
         mark_op.execute_single(file_or_folder)
     else:
-        Operation.process_folder(file_or_folder, mark_op)
+        Operation.process_folder(file_or_folder, mark_op, workers=workers, backend=backend)
 
-def mark_with_sequence(file_or_folder, sequence, align='c', min_char=5, max_char=10, start_y=1, **kwargs):
+def mark_with_sequence(file_or_folder, sequence, align='c', min_char=5, max_char=10, start_y=1,
+                       workers=None, backend='thread', **kwargs):
     """
     Marks files with a custom sequence.
 
@@ -66,6 +71,8 @@ def mark_with_sequence(file_or_folder, sequence, align='c', min_char=5, max_char
         min_char (float): The minimum height for characters (default is 5).
         max_char (float): The maximum height for characters (default is 20).
         start_y (float): The starting y-coordinate for the search (default is 1).
+        workers (int): Number of files marked concurrently in a folder (default: one at a time).
+        backend (str): Pool of the workers, 'thread' (default) or 'process'.
     """
     
     from .operations.basic_operations import AddMark, Operation
@@ -75,12 +82,12 @@ def mark_with_sequence(file_or_folder, sequence, align='c', min_char=5, max_char
     if os.path.isfile(file_or_folder):
         mark_op.execute_single(file_or_folder)
     else:
-        Operation.process_folder(file_or_folder, mark_op)
+        Operation.process_folder(file_or_folder, mark_op, workers=workers, backend=backend)
 
 
 
 def quick_count_holes(file_or_folder, min_diam=0, max_diam=float('inf'), 
-                    multiplier=None, verbose=False):
+                    multiplier=None, verbose=False, workers=None, backend='thread'):
     """
     Quickly counts holes in a folder.
     
@@ -90,6 +97,8 @@ def quick_count_holes(file_or_folder, min_diam=0, max_diam=float('inf'),
         max_diam: Maximum diameter
         multiplier: Optional function that takes file_name and returns a multiplier
         verbose: If True, shows details for each file
+        workers: Number of files counted concurrently in a folder (default: one at a time)
+        backend: Pool of the workers, 'thread' (default) or 'process'
         
     Returns:
         dict with statistics
@@ -105,7 +114,7 @@ def quick_count_holes(file_or_folder, min_diam=0, max_diam=float('inf'),
     if os.path.isfile(file_or_folder):
         return counter.execute_single(file_or_folder)
     else:
-        return Counter.process_folder(file_or_folder, counter)
+        return Counter.process_folder(file_or_folder, counter, workers=workers, backend=backend)
 
 
 
@@ -1,20 +1,46 @@
 """
 Backup management system for DXF files.
-The backup is created as .dxf.bak and is automatically restored before each modification.
+The backup is created as .dxf.bak; every later run parses the original straight from it
+(ensure_backup) and replaces the file with its output.
+With use_store() the originals go to a compressed, deduplicated BackupStore instead of
+the sidecars; the methods keep the same semantics.
 """
 import os
 import shutil
 from pathlib import Path
 
+from snapmark.utils.backup_store import BackupStore
+
 
 class BackupManager:
     """Manages backup and restore of DXF files."""
     
     BACKUP_EXTENSION = ".bak"
     
+    # BackupStore holding the originals; None keeps them in .bak sidecars
+    store = None
+    
+    @staticmethod
+    def use_store(store):
+        """
+        Keeps the originals in a content-addressed store instead of .bak sidecars.
+        
+        Args:
+            store: BackupStore, or the folder of one; None goes back to .bak sidecars
+            
+        Returns:
+            The BackupStore in use (or None)
+        """
+        if store is not None and not isinstance(store, BackupStore):
+            store = BackupStore(store)
+        BackupManager.store = store
+        return store
+    
     @staticmethod
     def get_backup_path(file_path: str) -> str:
-        """Returns the path of the backup file."""
+        """Returns the path of the backup file (with a store: its object, None if not stored)."""
+        if BackupManager.store is not None:
+            return BackupManager.store.source(file_path)
         return file_path + BackupManager.BACKUP_EXTENSION
     
     @staticmethod
@@ -35,6 +61,12 @@ class BackupManager:
             print(f"⚠ Backup skipped: '{os.path.basename(file_path)}' is not a DXF file.")
             return False
     
+        if BackupManager.store is not None:
+            if not BackupManager.store.put(file_path, force=force):
+                return False
+            print(f"✓ Backup created: {os.path.basename(file_path)} (store)")
+            return True
+        
         backup_path = BackupManager.get_backup_path(file_path)
         
         # If the backup already exists and we are not forcing, do nothing
@@ -61,6 +93,19 @@ class BackupManager:
         Raises:
             PermissionError: If file is open in another application
         """
+        if BackupManager.store is not None:
+            try:
+                restored = BackupManager.store.restore(file_path, delete=delete_backup)
+            except PermissionError:
+                raise PermissionError(
+                    f"Cannot restore '{file_path}' because it is open in another application."
+                )
+            if not restored:
+                print(f"⚠ No backup found for: {os.path.basename(file_path)}")
+            elif delete_backup:
+                print(f"↻ Restored and backup deleted: {os.path.basename(file_path)}")
+            return restored
+        
         backup_path = BackupManager.get_backup_path(file_path)
         
         if not os.path.exists(backup_path):
@@ -115,13 +160,16 @@ class BackupManager:
                 not_found_count += 1
         elif path_obj.is_dir():
             # Folder
-            if recursive:
-                backup_files = list(path_obj.rglob("*.dxf.bak")) + list(path_obj.rglob("*.DXF.bak"))
+            if BackupManager.store is not None:
+                original_paths = BackupManager.store.paths_in(str(path_obj), recursive)
             else:
-                backup_files = [p for p in path_obj.iterdir() if p.suffix.lower() == ".bak" and p.stem.lower().endswith(".dxf")]
+                if recursive:
+                    backup_files = list(path_obj.rglob("*.dxf.bak")) + list(path_obj.rglob("*.DXF.bak"))
+                else:
+                    backup_files = [p for p in path_obj.iterdir() if p.suffix.lower() == ".bak" and p.stem.lower().endswith(".dxf")]
+                original_paths = [str(p)[:-len(BackupManager.BACKUP_EXTENSION)] for p in backup_files]
 
-            for backup_path in backup_files:
-                original_path = str(backup_path)[:-len(BackupManager.BACKUP_EXTENSION)]
+            for original_path in original_paths:
                 if BackupManager.restore_backup(original_path, delete_backup=delete_backups):
                     restored_count += 1
                 else:
@@ -137,8 +185,31 @@ class BackupManager:
     @staticmethod
     def has_backup(file_path: str) -> bool:
         """Checks if a backup exists for the file."""
+        if BackupManager.store is not None:
+            return BackupManager.store.has(file_path)
         return os.path.exists(BackupManager.get_backup_path(file_path))
     
+    @staticmethod
+    def ensure_backup(file_path: str) -> str:
+        """
+        Ensures that the original of the file is preserved and returns where to read it from.
+        If a backup exists, it is the original: its path is returned and nothing is copied.
+        Otherwise, it creates a backup of the current file and returns the file itself.
+        
+        Unlike ensure_original, the backup is not copied back over the file: the caller parses
+        the returned path and replaces the file with its output.
+        
+        Raises:
+            PermissionError: If the backup cannot be created
+        """
+        backup_path = BackupManager.get_backup_path(file_path)
+        
+        if backup_path is not None and os.path.exists(backup_path):
+            return backup_path
+        
+        BackupManager.create_backup(file_path, force=False)
+        return file_path
+    
     @staticmethod
     def ensure_original(file_path: str):
         """
@@ -151,9 +222,7 @@ class BackupManager:
         Raises:
             PermissionError: If file is open in another application
         """
-        backup_path = BackupManager.get_backup_path(file_path)
-        
-        if os.path.exists(backup_path):
+        if BackupManager.has_backup(file_path):
             # A backup already exists: restore from it (it is the original)
             BackupManager.restore_backup(file_path, delete_backup=False)
         else:
@@ -0,0 +1,240 @@
+"""
+Content-addressed store of original DXF files.
+An alternative to the .dxf.bak sidecars: every original is gzip-compressed under one folder
+and named after the SHA-256 of its bytes, so identical drawings are stored once. A SQLite
+index maps the path of each backed-up file to the hash of its original.
+
+Layout:
+    <root>/index.sqlite
+    <root>/objects/ab/ab12...ef.dxf.gz
+"""
+import contextlib
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class BackupStore:
+    """
+    Compressed, deduplicated store of originals, used by BackupManager.use_store().
+
+    Safe to share between threads and processes; when pickled (e.g. sent to a worker
+    process) only the root travels, the index is reopened on first use.
+    """
+
+    OBJECT_EXTENSION = ".dxf.gz"
+
+    def __init__(self, root: str, compresslevel: int = 6):
+        """
+        Args:
+            root: Folder of the store (created if missing).
+            compresslevel: gzip level of the stored objects (1 fastest - 9 smallest).
+        """
+        self.root = os.path.abspath(root)
+        self.compresslevel = compresslevel
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"BackupStore(root={self.root!r})"
+
+    def __getstate__(self):
+        return {'root': self.root, 'compresslevel': self.compresslevel}
+
+    def __setstate__(self, state):
+        self.__init__(state['root'], state['compresslevel'])
+
+    def _connect(self):
+        if self._connection is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._connection = sqlite3.connect(
+                os.path.join(self.root, "index.sqlite"), timeout=30, check_same_thread=False
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS originals ("
+                "path TEXT PRIMARY KEY, digest TEXT NOT NULL, mode INTEGER, mtime REAL, stored REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS originals_digest ON originals (digest)")
+            self._connection.commit()
+        return self._connection
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """
+        Write transaction on the index (the caller holds self._lock).
+
+        BEGIN IMMEDIATE takes the SQLite write lock up front, so the transactions of every
+        thread and process sharing the store run one at a time.
+        """
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def object_path(self, digest: str) -> str:
+        """Returns the path of the object holding the content with the given hash."""
+        return os.path.join(self.root, "objects", digest[:2], digest + self.OBJECT_EXTENSION)
+
+    def _entry(self, file_path: str):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT digest, mode, mtime FROM originals WHERE path = ?", (self._key(file_path),)
+            ).fetchone()
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM originals").fetchone()[0]
+
+    def has(self, file_path: str) -> bool:
+        """Checks if the original of the file is stored."""
+        return self._entry(file_path) is not None
+
+    def source(self, file_path: str):
+        """Returns the object holding the original of the file, or None if it is not stored."""
+        entry = self._entry(file_path)
+        return self.object_path(entry[0]) if entry is not None else None
+
+    def put(self, file_path: str, force: bool = False) -> bool:
+        """
+        Stores the current content of the file as its original.
+
+        Args:
+            file_path: Path of the file to store
+            force: If True, replaces an original already stored for the file
+
+        Returns:
+            True if stored, False if the file already had an original
+        """
+        if not force and self.has(file_path):
+            return False
+
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        compressed = gzip.compress(data, compresslevel=self.compresslevel)
+        stat = os.stat(file_path)
+
+        # The object is checked, written and indexed in one write transaction, so a concurrent
+        # remove() (thread or process) cannot delete it between the check and the index row
+        object_path = self.object_path(digest)
+        with self._lock, self._transaction() as connection:
+            # Identical drawings share the same object
+            if not os.path.exists(object_path):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                tmp_path = f"{object_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    with open(tmp_path, 'wb') as f:
+                        f.write(compressed)
+                    os.replace(tmp_path, object_path)
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+            connection.execute(
+                "INSERT OR REPLACE INTO originals (path, digest, mode, mtime, stored) VALUES (?, ?, ?, ?, ?)",
+                (self._key(file_path), digest, stat.st_mode, stat.st_mtime, time.time())
+            )
+        return True
+
+    def read(self, file_path: str):
+        """Returns the bytes of the original of the file, or None if it is not stored."""
+        source = self.source(file_path)
+        if source is None:
+            return None
+        with gzip.open(source, 'rb') as f:
+            return f.read()
+
+    def restore(self, file_path: str, delete: bool = False) -> bool:
+        """
+        Writes the original back over the file (mode and modification time included).
+
+        Args:
+            file_path: Path of the file to restore
+            delete: If True, removes the original from the store after restoration
+
+        Returns:
+            True if restored, False if the file has no stored original
+
+        Raises:
+            PermissionError: If the file is open in another application
+        """
+        entry = self._entry(file_path)
+        if entry is None:
+            return False
+        digest, mode, mtime = entry
+
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            data = f.read()
+
+        tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            if mode is not None:
+                os.chmod(tmp_path, mode & 0o7777)
+            if mtime is not None:
+                os.utime(tmp_path, (mtime, mtime))
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        if delete:
+            self.remove(file_path)
+        return True
+
+    def remove(self, file_path: str) -> None:
+        """Removes the original of the file; its object is deleted once no file refers to it."""
+        key = self._key(file_path)
+        # Same write transaction as put(): no file can start referring to the object while it is deleted
+        with self._lock, self._transaction() as connection:
+            row = connection.execute("SELECT digest FROM originals WHERE path = ?", (key,)).fetchone()
+            if row is None:
+                return
+            connection.execute("DELETE FROM originals WHERE path = ?", (key,))
+            still_used = connection.execute(
+                "SELECT 1 FROM originals WHERE digest = ? LIMIT 1", (row[0],)
+            ).fetchone()
+            if still_used is None:
+                try:
+                    os.remove(self.object_path(row[0]))
+                except FileNotFoundError:
+                    pass
+
+    def paths_in(self, folder: str, recursive: bool = False) -> list:
+        """
+        Returns the files of a folder that have a stored original.
+
+        Args:
+            folder: Folder to look in
+            recursive: If True, includes the files of the subfolders
+        """
+        folder_key = self._key(folder)
+        prefix = os.path.join(folder_key, "")
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT path FROM originals WHERE substr(path, 1, ?) = ? ORDER BY path",
+                (len(prefix), prefix)
+            ).fetchall()
+        paths = [row[0] for row in rows]
+        if not recursive:
+            paths = [p for p in paths if os.path.dirname(p) == folder_key]
+        return paths
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
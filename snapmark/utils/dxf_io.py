@@ -0,0 +1,91 @@
+"""
+Backup-aware reading and atomic writing of DXF files.
+
+When a file already has a backup, its pristine bytes are parsed straight from the .bak
+instead of first copying the backup over the file and parsing the copy; the output then
+replaces the file atomically. A re-run reads each file once and writes it once.
+Originals kept in a BackupStore are gzip objects and are decompressed in memory.
+"""
+import gzip
+import io
+import os
+import shutil
+import threading
+
+import ezdxf
+from ezdxf.filemanagement import dxf_stream_info
+
+from snapmark.utils.backup_manager import BackupManager
+from snapmark.utils.backup_store import BackupStore
+
+
+BINARY_DXF_SENTINEL = b"AutoCAD Binary DXF\r\n\x1a\x00"
+
+
+def read_dxf(source: str, file_path: str = None):
+    """
+    Reads a DXF document.
+
+    Args:
+        source: File holding the bytes to parse (e.g. the backup of file_path).
+        file_path: Path the document belongs to (default: source).
+    """
+    if source.endswith(BackupStore.OBJECT_EXTENSION):
+        with gzip.open(source, 'rb') as f:
+            return read_dxf_bytes(f.read(), file_path or source)
+    doc = ezdxf.readfile(source)
+    doc.filename = file_path or source
+    return doc
+
+
+def read_dxf_bytes(data: bytes, file_path: str = None):
+    """
+    Reads a DXF document from its bytes (ASCII or binary DXF), like ezdxf.readfile.
+
+    Args:
+        data: Content of the DXF file.
+        file_path: Path the document belongs to.
+    """
+    from ezdxf.document import Drawing
+    from ezdxf.lldxf.tagger import binary_tags_loader
+
+    if data.startswith(BINARY_DXF_SENTINEL):
+        doc = Drawing.load(binary_tags_loader(data, errors="surrogateescape"))
+    else:
+        info = dxf_stream_info(io.StringIO(data.decode("utf-8", errors="ignore")))
+        doc = ezdxf.read(io.StringIO(data.decode(info.encoding, errors="surrogateescape")))
+    doc.filename = file_path
+    return doc
+
+
+def save_atomic(doc, file_path: str) -> None:
+    """
+    Saves the document to file_path through a temporary file and os.replace.
+
+    Readers never see a half-written file and a failed save leaves the previous file untouched.
+    The permissions of an existing file are kept.
+    """
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        doc.saveas(tmp_path)
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        doc.filename = file_path
+
+
+def discard_output(file_path: str, source: str) -> None:
+    """
+    Called when the output of a file is not saved: if the original was read from the backup,
+    the file still holds the output of a previous run and is restored from the backup.
+    """
+    if source != file_path:
+        try:
+            BackupManager.restore_backup(file_path, delete_backup=False)
+        except PermissionError:
+            pass
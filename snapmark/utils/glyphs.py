@@ -0,0 +1,90 @@
+"""
+Glyph table compiled from number_segments_dict.
+Every glyph is turned once, at import, into a NumPy stroke array with its bounds, so laying out
+a text at any scale is a vectorized scale-and-offset instead of rebuilding lists per character.
+"""
+import numpy as np
+
+from snapmark.utils.segments_dict import number_segments_dict
+
+
+class Glyph:
+    """Stroke of one character (unit scale) with its bounds."""
+
+    __slots__ = ('points', 'min_x', 'max_x', 'min_y', 'max_y')
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.min_x, self.min_y = self.points.min(axis=0)
+        self.max_x, self.max_y = self.points.max(axis=0)
+
+    def __repr__(self):
+        return f"Glyph({len(self.points)} points, width={self.max_x - self.min_x}, height={self.max_y - self.min_y})"
+
+
+# Compiled once: character -> Glyph
+GLYPHS = {char: Glyph(points) for char, points in number_segments_dict.items()}
+
+
+class TextLayout:
+    """
+    Layout of a text, valid at every scale.
+
+    The bounds of the glyphs are gathered once; the size and the character positions
+    at a given scale are then a few vectorized operations. It is the only layout of
+    the placement: zero-width glyphs (e.g. '1') count as half their height.
+    """
+
+    def __init__(self, text, space=1.5):
+        """
+        Args:
+            text (str): Text to lay out (characters without a glyph are skipped).
+            space (float): Spacing factor between characters.
+        """
+        self.glyphs = [GLYPHS[char] for char in text if char in GLYPHS]
+        self.space = space
+        bounds = np.array([(g.min_x, g.max_x, g.min_y, g.max_y) for g in self.glyphs], dtype=float).reshape(-1, 4)
+        self._min_x, self._max_x, self._min_y, self._max_y = bounds.T
+
+    def __len__(self):
+        return len(self.glyphs)
+
+    def _widths(self, scale):
+        """Width and height of each glyph at the given scale (zero width counts as half the height)."""
+        widths = self._max_x * scale - self._min_x * scale
+        heights = self._max_y * scale - self._min_y * scale
+        return np.where(widths == 0, heights / 2, widths), heights
+
+    def height(self, scale):
+        """Height of the tallest glyph at the given scale."""
+        heights = self._max_y * scale - self._min_y * scale
+        return float(max(0.0, heights.max())) if len(heights) else 0.0
+
+    def dims(self, scale):
+        """
+        Returns (lenght, height) of the text at the given scale.
+        """
+        if not self.glyphs:
+            return 0.0, 0.0
+        widths, heights = self._widths(scale)
+        advances = widths * self.space
+        lenght = float(np.cumsum(np.concatenate(([0.0], advances)))[-1])
+        lenght -= float(widths[-1]) * (self.space - 1)
+        return lenght, float(max(0.0, heights.max()))
+
+    def positions(self, scale, x_pos=0, y_pos=0):
+        """x of each character at the given scale (starting at x_pos), as a float array."""
+        if not self.glyphs:
+            return np.empty(0)
+        widths, _ = self._widths(scale)
+        return np.cumsum(np.concatenate(([x_pos], widths * self.space)))[:-1]
+
+    def strokes(self, scale, x_pos=0, y_pos=0):
+        """
+        Lays out the text at the given scale.
+
+        Returns:
+            list: One (scaled_segments, [x, y]) pair per character, as lists.
+        """
+        xs = self.positions(scale, x_pos, y_pos)
+        return [((glyph.points * scale).tolist(), [float(x), y_pos]) for glyph, x in zip(self.glyphs, xs)]
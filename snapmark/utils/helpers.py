@@ -4,6 +4,8 @@ Helpers.py - Generic utility functions for SnapMark.
 Collects common helper functions used by multiple modules.
 """
 
+from functools import partial
+
 from snapmark.checking.checking import find_spec_holes
 
 
@@ -27,40 +29,120 @@ def find_all_circles(doc):
     return msp.query('CIRCLE')
 
 
+import fnmatch
+import os
+import re
 from pathlib import Path
 from snapmark.utils.messages import file_not_found_error, not_a_dxf_error, no_dxf_found_error
 
-def find_dxf_files(folder_path, recursive=False):
-    """Finds all DXF files in a folder or validates a single DXF file."""
-    
+
+def _compile_patterns(patterns):
+    """Returns a list of match functions for glob strings and compiled regexes."""
+    if patterns is None:
+        return []
+    if isinstance(patterns, (str, re.Pattern)):
+        patterns = [patterns]
+    matchers = []
+    for pattern in patterns:
+        if isinstance(pattern, re.Pattern):
+            matchers.append(pattern.search)
+        else:
+            # Case-insensitive like the .dxf check, on every platform
+            matchers.append(lambda name, pattern=pattern.lower(): fnmatch.fnmatchcase(name.lower(), pattern))
+    return matchers
+
+
+def iter_dxf_files(folder_path, file_pattern="*.dxf", recursive=False, min_size=None, max_size=None,
+                   exclude=None):
+    """
+    Yields the DXF files of a folder while walking it, so processing can start on the first match.
+
+    Built on os.scandir: names, types and (only with size filters) sizes come from the directory
+    entries. Each directory is listed in name order; excluded subfolders are not entered.
+
+    Args:
+        folder_path: Folder to walk, or a single DXF file (yielded as is).
+        file_pattern: Glob (e.g. "F*.dxf", case-insensitive) or compiled regex (re.search) the
+            file names must match; a list matches any of them (default: "*.dxf").
+        recursive: If True, walks the subfolders as well.
+        min_size: Minimum file size in bytes.
+        max_size: Maximum file size in bytes.
+        exclude: Globs or regexes of files and folders to skip, matched against the name and
+            the path relative to folder_path (e.g. "old", "*_rev0.dxf", "archive/*").
+
+    Yields:
+        Path: DXF files, in walking order.
+    """
     path = Path(folder_path)
-    
-    # 1. Controlla se esiste
+
     if not path.exists():
         print(file_not_found_error(folder_path))
-        return []
-    
-    # 2. Se è un FILE singolo
+        return
+
     if path.is_file():
-        # Controlla se è un DXF
         if path.suffix.lower() != ".dxf":
             print(not_a_dxf_error(path.name))
-            return []
-        print(f"🔧 Found 1 file to process: {path.name}")
-        return [path]
-    
-    # 3. Se è una CARTELLA
-    if recursive:
-        dxf_files = [f for f in path.rglob("*") if f.suffix.lower() == ".dxf"]
-    else:
-        dxf_files = [f for f in path.iterdir() if f.suffix.lower() == ".dxf"]
-    
-    # 4. Se non trova nessun DXF
-    if not dxf_files:
+            return
+        yield path
+        return
+
+    patterns = _compile_patterns(file_pattern)
+    excluded = _compile_patterns(exclude)
+
+    def is_excluded(name, relative):
+        return any(match(name) or match(relative) for match in excluded)
+
+    found = 0
+    folders = [(str(path), "")]
+    while folders:
+        folder, prefix = folders.pop()
+        try:
+            with os.scandir(folder) as scan:
+                entries = sorted(scan, key=lambda entry: entry.name)
+        except OSError:
+            # Unreadable subfolder: skipped like the files that do not match
+            continue
+
+        subfolders = []
+        for entry in entries:
+            relative = prefix + entry.name
+            if is_excluded(entry.name, relative):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        subfolders.append((entry.path, relative + "/"))
+                    continue
+                if not entry.is_file() or not entry.name.lower().endswith(".dxf"):
+                    continue
+                if patterns and not any(match(entry.name) for match in patterns):
+                    continue
+                if min_size is not None or max_size is not None:
+                    size = entry.stat().st_size
+                    if (min_size is not None and size < min_size) or (max_size is not None and size > max_size):
+                        continue
+            except OSError:
+                continue
+            found += 1
+            yield Path(entry.path)
+
+        # Stack: subfolders are walked depth-first, in name order
+        folders.extend(reversed(subfolders))
+
+    if not found:
         print(no_dxf_found_error(folder_path))
-        return []
+
+
+def find_dxf_files(folder_path, recursive=False, file_pattern="*.dxf", min_size=None, max_size=None,
+                   exclude=None):
+    """Finds all DXF files in a folder or validates a single DXF file (see iter_dxf_files)."""
+    
+    dxf_files = list(iter_dxf_files(folder_path, file_pattern, recursive, min_size, max_size, exclude))
     
-    print(f"🔧 Found {len(dxf_files)} file(s) to process in {folder_path}")
+    if len(dxf_files) == 1 and Path(folder_path).is_file():
+        print(f"🔧 Found 1 file to process: {dxf_files[0].name}")
+    elif dxf_files:
+        print(f"🔧 Found {len(dxf_files)} file(s) to process in {folder_path}")
     return dxf_files
 
 
@@ -96,7 +178,8 @@ def select_files(filtered_files):
 def find_circle_by_radius(min_diam=0, max_diam=float('inf')):
     """Creates a function that finds circles within a specified diameter range."""
     
-    return lambda doc: find_spec_holes(doc, min_diam, max_diam)
+    # A partial (not a lambda) can be pickled and sent to worker processes
+    return partial(find_spec_holes, diametro_minimo=min_diam, diametro_massimo=max_diam)
 
 
 
@@ -0,0 +1,182 @@
+"""
+Manifest of incremental batch runs.
+For every file of the last successful run it keeps the size, mtime and SHA-256 of the file
+as the run left it, the fingerprint of the pipeline that produced it and the share of the
+running totals (e.g. Counter) it contributed. A file whose signature and pipeline still
+match is skipped: an unchanged folder costs one stat per file.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+import types
+
+import numpy as np
+
+
+# Bump when the output of the operations changes, so older runs are no longer trusted
+MANIFEST_VERSION = 1
+
+MANIFEST_NAME = ".snapmark-manifest.json"
+
+
+def _describe(value, seen):
+    """Returns a JSON-serializable description of a value that does not change across runs."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return hashlib.sha256(value).hexdigest()
+    if isinstance(value, os.PathLike):
+        return os.fspath(value)
+    if isinstance(value, np.ndarray):
+        return [str(value.dtype), list(value.shape), hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()]
+    if isinstance(value, np.generic):
+        return value.item()
+
+    if id(value) in seen:
+        return '<cycle>'
+    seen = seen | {id(value)}
+
+    if isinstance(value, (list, tuple)):
+        return [_describe(item, seen) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(json.dumps(_describe(item, seen), sort_keys=True) for item in value)
+    if isinstance(value, dict):
+        return sorted(([str(key), _describe(item, seen)] for key, item in value.items()), key=lambda item: item[0])
+    if isinstance(value, functools.partial):
+        return ['partial', _describe(value.func, seen), _describe(value.args, seen), _describe(value.keywords, seen)]
+    if isinstance(value, types.MethodType):
+        return ['method', _describe(value.__self__, seen), _describe(value.__func__, seen)]
+    if isinstance(value, types.FunctionType):
+        # The code itself is described, so editing a function (or a lambda) changes the fingerprint
+        closure = [cell.cell_contents for cell in value.__closure__ or ()]
+        return ['function', value.__module__, value.__qualname__, _describe(value.__code__, seen),
+                _describe(value.__defaults__, seen), _describe(value.__kwdefaults__, seen), _describe(closure, seen)]
+    if isinstance(value, types.CodeType):
+        return ['code', value.co_code.hex(), _describe(value.co_consts, seen), list(value.co_names)]
+    if isinstance(value, types.ModuleType):
+        return ['module', value.__name__]
+    if isinstance(value, (types.BuiltinFunctionType, type)):
+        return [getattr(value, '__module__', None), value.__qualname__]
+
+    # Any other object: its class and its state, without the results of the last file
+    name = f"{type(value).__module__}.{type(value).__qualname__}"
+    get_state = getattr(type(value), '__getstate__', None)
+    if get_state is not None and get_state is not getattr(object, '__getstate__', None):
+        state = value.__getstate__()
+    else:
+        state = getattr(value, '__dict__', None)
+    if not isinstance(state, dict):
+        return [name]
+    excluded = getattr(type(value), 'RESULT_ATTRIBUTES', ())
+    return [name, _describe({key: item for key, item in state.items() if key not in excluded}, seen)]
+
+
+def fingerprint(value) -> str:
+    """Returns the SHA-256 of the description of a value (e.g. an operation and its parameters)."""
+    description = json.dumps([MANIFEST_VERSION, _describe(value, frozenset())], sort_keys=True, default=str)
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+
+def file_sha256(file_path: str) -> str:
+    """Returns the SHA-256 of the content of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Records of the last successful run on the files of a folder, stored as JSON.
+
+    Example:
+        >>> manifest = Manifest("folder/.snapmark-manifest.json", "folder")
+        >>> if not manifest.is_unchanged(file_path, pipeline):
+        ...     ...  # process the file
+        ...     manifest.record(file_path, pipeline, totals)
+        >>> manifest.save()
+    """
+
+    def __init__(self, path: str, folder: str):
+        """
+        Args:
+            path: JSON file of the manifest (read if it exists).
+            folder: Folder the file paths are stored relative to.
+        """
+        self.path = path
+        self.folder = os.path.abspath(folder)
+        self.entries = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.entries = data.get('files', {})
+        except (OSError, ValueError, AttributeError):
+            # Missing or unreadable manifest: every file is processed
+            pass
+
+    def _key(self, file_path: str) -> str:
+        return os.path.relpath(os.path.abspath(file_path), self.folder).replace(os.sep, '/')
+
+    def is_unchanged(self, file_path: str, pipeline: str) -> bool:
+        """
+        Checks if the file and the pipeline are the same as in the last successful run.
+        Size and mtime are compared first; the content is hashed only when the mtime differs
+        (e.g. the file was copied or touched), and a matching hash refreshes the stored mtime.
+        """
+        entry = self.entries.get(self._key(file_path))
+        if entry is None or entry['pipeline'] != pipeline:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        if stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime_ns == entry['mtime_ns']:
+            return True
+        if file_sha256(file_path) != entry['sha256']:
+            return False
+        with self._lock:
+            entry['mtime_ns'] = stat.st_mtime_ns
+        return True
+
+    def totals(self, file_path: str) -> list:
+        """Returns the share of the running totals the file contributed, one item per operation."""
+        return self.entries[self._key(file_path)].get('totals') or []
+
+    def record(self, file_path: str, pipeline: str, totals=None) -> None:
+        """Stores the file as the run left it, with the pipeline fingerprint and its totals."""
+        stat = os.stat(file_path)
+        entry = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(file_path),
+            'pipeline': pipeline,
+            'totals': totals or [],
+        }
+        with self._lock:
+            self.entries[self._key(file_path)] = entry
+
+    def forget(self, file_path: str) -> None:
+        """Removes the record of a file (e.g. it failed), so the next run processes it."""
+        with self._lock:
+            self.entries.pop(self._key(file_path), None)
+
+    def save(self) -> None:
+        """Writes the manifest through a temporary file and os.replace."""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with self._lock:
+            data = {'version': MANIFEST_VERSION, 'files': self.entries}
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
@@ -58,6 +58,13 @@ def dxf_3d_geometry_error(file_name: str) -> str:
         "Please flatten your DXF to 2D before processing and ensure all Z coordinates are zero.\n\n"
     )
 
+def not_picklable_error(reason: str) -> str:
+    """Message when the operations cannot be sent to worker processes."""
+    return (
+        f"❌ The operations cannot be sent to worker processes: {reason}\n"
+        "Use module-level functions instead of lambdas (e.g. find_circle_by_radius) or run with workers=None."
+    )
+
 # Success messages
 def backup_created(file_name: str) -> str:
     """Message when backup is created."""
@@ -0,0 +1,173 @@
+"""
+Pool execution of SnapMark jobs (IterationManager pipelines or single operations).
+
+Every file is processed by worker copies of the operations (Operation.copy_for_worker):
+settings are shared, per-file state and counters are private to the copy. Workers send
+back the copies, the captured messages and the placement counters; the parent merges the
+copies into its own operations (Operation.merge, e.g. Counter totals) in file order, so
+results and report do not depend on which worker finished first.
+
+Two backends:
+    - 'process': the job is pickled once and rebuilt in every worker by the pool initializer.
+    - 'thread': workers share the job in this process (no pickling, the GIL limits the speed-up).
+"""
+import copy
+import io
+import os
+import pickle
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from snapmark.utils.backup_manager import BackupManager
+from snapmark.utils.messages import not_picklable_error
+
+
+BACKENDS = ('process', 'thread')
+
+# Job rebuilt in the worker process by _init_worker
+_worker_job = None
+
+
+class FileResult:
+    """Outcome of one file processed by a worker."""
+
+    __slots__ = ('file_path', 'success', 'output', 'placement', 'parts')
+
+    def __init__(self, file_path, success, output, placement, parts):
+        self.file_path = file_path
+        self.success = success
+        self.output = output
+        self.placement = placement
+        self.parts = parts
+
+
+class _ThreadLocalStdout:
+    """Replacement of sys.stdout sending the prints of each thread to its own buffer, if it has one."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def _install_stdout():
+    """Installs the thread-local stdout (once) and returns it."""
+    if not isinstance(sys.stdout, _ThreadLocalStdout):
+        sys.stdout = _ThreadLocalStdout(sys.stdout)
+    return sys.stdout
+
+
+def _captured(function, *args):
+    """Runs function capturing what the current thread prints; returns (result, output)."""
+    stdout = _install_stdout()
+    stdout.local.buffer = io.StringIO()
+    try:
+        return function(*args), stdout.local.buffer.getvalue()
+    finally:
+        stdout.local.buffer = None
+
+
+class ManagerJob:
+    """Runs the whole pipeline of an IterationManager on one file."""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.backup_store = BackupManager.store
+
+    def run(self, file_path):
+        manager = copy.copy(self.manager)
+        manager.operation_list = [operation.copy_for_worker() for operation in self.manager.operation_list]
+        placement = {}
+        success, output = _captured(manager._process_single_file, file_path, placement)
+        return FileResult(file_path, success, output, placement.get(file_path, []), manager.operation_list)
+
+
+class OperationJob:
+    """Runs Operation.execute_single on one file."""
+
+    def __init__(self, operation, use_backup):
+        self.operation = operation
+        self.use_backup = use_backup
+        self.backup_store = BackupManager.store
+
+    def run(self, file_path):
+        operation = self.operation.copy_for_worker()
+        success, output = _captured(operation.execute_single, file_path, self.use_backup)
+        return FileResult(file_path, success, output, [], [operation])
+
+
+def _init_worker(payload):
+    global _worker_job
+    _worker_job = pickle.loads(payload)
+    # Worker processes started with 'spawn' do not inherit BackupManager.use_store()
+    BackupManager.store = _worker_job.backup_store
+
+
+def _run_worker_job(file_path):
+    return _worker_job.run(file_path)
+
+
+def resolve_workers(workers):
+    """Number of workers for a workers option (None/1: no pool, 0 or negative: all cores)."""
+    if workers is None:
+        return 1
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def run_in_pool(job, file_paths, workers, backend='process'):
+    """
+    Runs a job on files with a pool of workers.
+
+    Args:
+        job (ManagerJob or OperationJob): What to run on every file.
+        file_paths (list): Paths of the files to process.
+        workers (int): Number of workers.
+        backend (str): 'process' (default) or 'thread'.
+
+    Yields:
+        FileResult: One per file, in the order of file_paths.
+
+    Raises:
+        ValueError: If the backend is unknown.
+        TypeError: If the job cannot be pickled for the 'process' backend (e.g. it holds lambdas).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown pool backend '{backend}'.")
+
+    if backend == 'thread':
+        previous_stdout = sys.stdout
+        _install_stdout()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                yield from pool.map(job.run, file_paths)
+        finally:
+            sys.stdout = previous_stdout
+        return
+
+    try:
+        payload = pickle.dumps(job)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        raise TypeError(not_picklable_error(str(e))) from e
+
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(payload,)) as pool:
+        yield from pool.map(_run_worker_job, file_paths, chunksize=chunksize)
+
+
+def merge_result(operations, result):
+    """Merges the worker copies of a result into the given operations and replays its messages."""
+    print(result.output, end='')
+    for operation, part in zip(operations, result.parts):
+        operation.merge(part)
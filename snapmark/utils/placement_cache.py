@@ -0,0 +1,127 @@
+"""
+Persistent cache of placement results.
+A placement is stored under a hash of the tessellated geometry, the sequence text and the
+placement parameters, so re-marking an unchanged drawing skips the whole search.
+Entries live in a SQLite file and the least recently used ones are evicted past max_entries.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+# Bump when the placement algorithm changes, so older results are no longer used
+PLACEMENT_CACHE_VERSION = 3
+
+
+def placement_key(segs, text: str, params: dict) -> str:
+    """
+    Returns the cache key of a placement.
+
+    Args:
+        segs: (N, 4) array of the tessellated geometry.
+        text: Sequence text to be placed.
+        params: Placement parameters that change the result (JSON serializable).
+    """
+    digest = hashlib.sha256()
+    digest.update(str(PLACEMENT_CACHE_VERSION).encode())
+    digest.update(np.ascontiguousarray(segs, dtype=np.float64).tobytes())
+    digest.update(text.encode('utf-8'))
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class PlacementCache:
+    """
+    LRU store of placement results on disk.
+
+    Safe to share between threads; when pickled (e.g. sent to a worker process) only
+    the path and the limit travel, the connection is reopened on first use.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        """
+        Args:
+            path: SQLite file of the cache (created if missing).
+            max_entries: Max number of placements kept (least recently used are evicted).
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"PlacementCache(path={self.path!r}, max_entries={self.max_entries})"
+
+    def __getstate__(self):
+        return {'path': self.path, 'max_entries': self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['max_entries'])
+
+    def _connect(self):
+        if self._connection is None:
+            folder = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(folder, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS placements ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS placements_lru ON placements (last_used)")
+            self._connection.commit()
+        return self._connection
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM placements").fetchone()[0]
+
+    def get(self, key: str):
+        """Returns the stored placement (marking it as recently used), or None."""
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute("SELECT value FROM placements WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            connection.execute("UPDATE placements SET last_used = ? WHERE key = ?", (time.time(), key))
+            connection.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, value) -> None:
+        """Stores a placement (JSON serializable) and evicts the least recently used ones past the limit."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO placements (key, value, last_used) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            if self.max_entries is not None:
+                connection.execute(
+                    "DELETE FROM placements WHERE key IN ("
+                    "SELECT key FROM placements ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            connection.commit()
+
+    def clear(self) -> None:
+        """Deletes every stored placement."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM placements")
+            connection.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
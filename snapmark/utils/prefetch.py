@@ -0,0 +1,77 @@
+"""
+Read-ahead and write-behind stages for batch processing.
+
+While the operations run on the current document, the next documents are parsed on
+background threads and the previous ones are saved by a writer thread, so disk and CPU
+work at the same time. Both stages are bounded by a queue depth: at most depth documents
+are loaded ahead and at most depth documents wait to be saved.
+"""
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import ezdxf
+
+
+def prefetch_documents(file_paths, depth=2, loader=ezdxf.readfile):
+    """
+    Loads documents ahead of the consumer.
+
+    Args:
+        file_paths (list): Files to load, in processing order.
+        depth (int): Max number of documents loaded (or loading) ahead.
+        loader (callable): Function reading one file (default: ezdxf.readfile).
+
+    Yields:
+        tuple: (file_path, future) in file order; future.result() returns the document
+        or raises the error of the loader.
+    """
+    paths = iter(file_paths)
+    with ThreadPoolExecutor(max_workers=depth, thread_name_prefix='snapmark-read') as pool:
+        pending = deque((path, pool.submit(loader, path)) for path in islice(paths, depth))
+        while pending:
+            file_path, future = pending.popleft()
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.append((next_path, pool.submit(loader, next_path)))
+            yield file_path, future
+
+
+class WriteBehindSaver:
+    """
+    Saves documents on a background writer thread, in submission order.
+
+    submit() blocks while depth saves are already pending, which caps the memory held
+    by documents waiting to be written.
+
+    Example:
+        >>> with WriteBehindSaver(depth=2) as saver:
+        ...     future = saver.submit(save_function, doc, file_path)
+    """
+
+    def __init__(self, depth=2):
+        """
+        Args:
+            depth (int): Max number of saves pending at the same time.
+        """
+        self.depth = depth
+        self._slots = threading.BoundedSemaphore(depth)
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='snapmark-write')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, save, *args):
+        """Schedules save(*args) and returns its Future (waits for a free slot first)."""
+        self._slots.acquire()
+        future = self._pool.submit(save, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def close(self):
+        """Waits for every pending save."""
+        self._pool.shutdown(wait=True)
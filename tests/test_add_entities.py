@@ -0,0 +1,26 @@
+"""Entities added in bulk must survive a save and reload of the document."""
+import ezdxf
+import numpy as np
+
+from snapmark.entities.add_entities import add_circles_bulk, add_lines_bulk, add_lwpolylines_bulk
+
+
+def test_bulk_entities_save_and_reload(tmp_path):
+    doc = ezdxf.new()
+    segs = np.array([[0, 0, 10, 0], [10, 0, 10, 5], [1.5, 2.5, 3.5, 4.5]])
+    add_lines_bulk(doc, segs, layer='MARK')
+    add_circles_bulk(doc, [(1, 1), (4, 2)], 0.5, layer='MARK')
+    add_lwpolylines_bulk(doc, [[(0, 0), (1, 0), (1, 1)]], layer='MARK')
+
+    file_path = str(tmp_path / "bulk.dxf")
+    doc.saveas(file_path)
+    reloaded = ezdxf.readfile(file_path)
+
+    assert not reloaded.audit().has_errors
+    msp = reloaded.modelspace()
+    lines = msp.query('LINE[layer=="MARK"]')
+    assert [(tuple(e.dxf.start)[:2], tuple(e.dxf.end)[:2]) for e in lines] == \
+        [((x1, y1), (x2, y2)) for x1, y1, x2, y2 in segs.tolist()]
+    assert [(tuple(e.dxf.center)[:2], e.dxf.radius) for e in msp.query('CIRCLE')] == [((1, 1), 0.5), ((4, 2), 0.5)]
+    assert [list(e.get_points('xy')) for e in msp.query('LWPOLYLINE')] == [[(0, 0), (1, 0), (1, 1)]]
+    assert len({e.dxf.handle for e in msp}) == len(msp)
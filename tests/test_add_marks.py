@@ -0,0 +1,78 @@
+"""AddMarks run by a thread pool must give the same labels as a serial run."""
+import glob
+import os
+import shutil
+
+import ezdxf
+
+from snapmark import AddMark, AddMarks, Operation, SequenceBuilder, from_file_name
+from snapmark.mark_algorithm.mark_algorithm import sequence_bounds
+
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "examples", "input")
+
+
+def _copy_examples(folder, copies=6):
+    os.makedirs(folder)
+    sources = [f for f in sorted(glob.glob(os.path.join(EXAMPLES, "F*.dxf")))]
+    for i in range(copies):
+        for source in sources:
+            name = f"{os.path.splitext(os.path.basename(source))[0]}_{i}.dxf"
+            shutil.copy(source, os.path.join(folder, name))
+
+
+def _mark_geometry(folder):
+    geometry = {}
+    for file_path in sorted(glob.glob(os.path.join(folder, "*.dxf"))):
+        msp = ezdxf.readfile(file_path).modelspace()
+        geometry[os.path.basename(file_path)] = sorted(
+            (round(e.dxf.start.x, 6), round(e.dxf.start.y, 6), round(e.dxf.end.x, 6), round(e.dxf.end.y, 6))
+            for e in msp.query('LINE[layer=="MARK"]')
+        )
+    return geometry
+
+
+def _add_marks():
+    return AddMarks([from_file_name(), (SequenceBuilder().literal('Q1').build(), 1)], min_char=3)
+
+
+def test_thread_pool_matches_serial_run(tmp_path):
+    serial, threaded = str(tmp_path / "serial"), str(tmp_path / "threaded")
+    _copy_examples(serial)
+    _copy_examples(threaded)
+
+    Operation.process_folder(serial, _add_marks(), use_backup=False)
+    Operation.process_folder(threaded, _add_marks(), use_backup=False, workers=8, backend='thread')
+
+    expected = _mark_geometry(serial)
+    assert any(expected.values())
+    assert _mark_geometry(threaded) == expected
+
+
+def test_worker_copies_do_not_share_marks():
+    operation = _add_marks()
+    worker = operation.copy_for_worker()
+    assert worker.marks is not operation.marks
+    assert all(a is not b for a, b in zip(worker.marks, operation.marks))
+
+
+def test_marks_keep_their_own_geometry_settings():
+    doc = ezdxf.new()
+    doc.layers.add('PART')
+    doc.modelspace().add_lwpolyline([(0, 0), (200, 0), (200, 100), (0, 100)], close=True, dxfattribs={'layer': 'PART'})
+    doc.header['$EXTMIN'] = (0, 0, 0)
+    doc.header['$EXTMAX'] = (200, 100, 0)
+
+    operation = AddMarks([
+        AddMark(SequenceBuilder().literal('A1').build(), priority=2),
+        AddMark(SequenceBuilder().literal('B2').build(), chord_error=0.05, priority=1),
+        AddMark(SequenceBuilder().literal('C3').build(), excluded_layers=['PART']),
+    ])
+    operation.execute(doc, "", "part.dxf")
+    first, second, third = (sequence_bounds(placed) for _, placed, _ in operation.placements)
+
+    # Different chord_error: placed on its own geometry, still avoiding the first label
+    assert first is not None and second is not None
+    assert first[2] <= second[0] or second[2] <= first[0] or first[3] <= second[1] or second[3] <= first[1]
+    # Every layer excluded: no geometry left to place the label on
+    assert third is None
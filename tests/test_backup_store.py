@@ -0,0 +1,31 @@
+"""Files with the same content share one object: removing one must never break the other."""
+import threading
+
+from snapmark.utils.backup_store import BackupStore
+
+
+def test_concurrent_put_and_remove_of_shared_object(tmp_path):
+    store = BackupStore(str(tmp_path / "store"))
+    paths = [tmp_path / "a.dxf", tmp_path / "b.dxf"]
+    for path in paths:
+        path.write_bytes(b"0\nSECTION\n" * 1000)
+
+    errors = []
+
+    def cycle(path):
+        try:
+            for _ in range(200):
+                store.put(str(path), force=True)
+                assert store.read(str(path)) is not None
+                store.remove(str(path))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=cycle, args=(path,)) for path in paths]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(store) == 0
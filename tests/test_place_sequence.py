@@ -0,0 +1,39 @@
+"""Parameter checks of place_sequence and AddMark."""
+import os
+
+import ezdxf
+import numpy as np
+import pytest
+
+from snapmark import AddMark, SequenceBuilder
+from snapmark.mark_algorithm import mark_algorithm as ma
+from snapmark.mark_algorithm.tessellation import arc_segment_counts
+
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "examples", "input", "F4.dxf")
+
+
+@pytest.mark.parametrize("rescale_tolerance", [0, -0.5])
+def test_rescale_tolerance_must_be_positive(rescale_tolerance):
+    doc = ezdxf.readfile(EXAMPLE)
+    with pytest.raises(ValueError):
+        ma.place_sequence(doc, 'F4', ma.comp_sf(doc), None, rescale_tolerance=rescale_tolerance)
+    with pytest.raises(ValueError):
+        AddMark(SequenceBuilder().literal('F4').build(), rescale_tolerance=rescale_tolerance)
+
+
+@pytest.mark.parametrize("method", ['scanline', 'raster', 'rectangles', 'scored'])
+def test_empty_drawing_gives_no_placement(method):
+    doc = ezdxf.new()
+    doc.header['$EXTMIN'] = (0, 0, 0)
+    doc.header['$EXTMAX'] = (100, 100, 0)
+    sequence = ma.place_sequence(doc, 'A1', ma.comp_sf(doc), None, method=method)
+    assert sequence.sequence == []
+
+
+@pytest.mark.parametrize("chord_error", [0, -0.1])
+def test_chord_error_must_be_positive(chord_error):
+    with pytest.raises(ValueError):
+        arc_segment_counts([10.0], [np.pi], chord_error)
+    with pytest.raises(ValueError):
+        AddMark(SequenceBuilder().literal('F4').build(), chord_error=chord_error)
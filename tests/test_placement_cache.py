@@ -0,0 +1,25 @@
+"""A placement served by PlacementCache must report the same result as the search."""
+import os
+
+import ezdxf
+
+from snapmark import AddMark, PlacementCache, SequenceBuilder
+
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "examples", "input", "F1.dxf")
+
+
+def test_cache_hit_restores_final_scale(tmp_path):
+    cache = PlacementCache(str(tmp_path / "placements.sqlite"))
+    sequence = SequenceBuilder().literal('A1').build()
+
+    first = AddMark(sequence, placement_cache=cache)
+    first.execute(ezdxf.readfile(EXAMPLE), os.path.dirname(EXAMPLE), "F1.dxf")
+    second = AddMark(sequence, placement_cache=cache)
+    second.execute(ezdxf.readfile(EXAMPLE), os.path.dirname(EXAMPLE), "F1.dxf")
+
+    assert not first.placement_stats.placement_cache_hit
+    assert second.placement_stats.placement_cache_hit
+    assert first.placement_stats.final_scale is not None
+    assert second.placement_stats.final_scale == first.placement_stats.final_scale
+    assert second.sequence_position.sequence == first.sequence_position.sequence
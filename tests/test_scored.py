@@ -0,0 +1,28 @@
+"""The 'scored' placement picks a better position, never a smaller text than 'scanline'."""
+import os
+
+import ezdxf
+
+from snapmark.mark_algorithm import mark_algorithm as ma
+from snapmark.mark_algorithm.topology import ContourTopology
+
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "examples", "input_customizable", "563E_SP8_Q1.DXF")
+
+
+def _bounds(sequence):
+    xs = [x + px for glyph, (px, _) in sequence.sequence for x, _ in glyph]
+    ys = [y + py for glyph, (_, py) in sequence.sequence for _, y in glyph]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def test_scored_keeps_scanline_height():
+    heights = {}
+    for method in ('scanline', 'scored'):
+        doc = ezdxf.readfile(EXAMPLE)
+        sequence = ma.place_sequence(doc, '563E', ma.comp_sf(doc), None, max_char=60, method=method)
+        x_min, y_min, x_max, y_max = _bounds(sequence)
+        assert ContourTopology(ma.PlacementContext(doc).segs).rect_is_clear(x_min, y_min, x_max, y_max)
+        heights[method] = y_max - y_min
+
+    assert heights['scored'] >= heights['scanline'] - 1e-9
@@ -0,0 +1,35 @@
+"""Open contours (e.g. marking lines) must not flip the material of the scanline search."""
+import os
+
+import ezdxf
+import numpy as np
+
+from snapmark.mark_algorithm import mark_algorithm as ma
+from snapmark.mark_algorithm.topology import ContourTopology
+
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "examples", "input", "nested", "BB.dxf")
+
+
+def _rect(x0, y0, x1, y1):
+    return [[x0, y0, x1, y0], [x1, y0, x1, y1], [x1, y1, x0, y1], [x0, y1, x0, y0]]
+
+
+def test_nesting_depth():
+    segs = np.array(_rect(0, 0, 100, 100) + _rect(10, 10, 40, 40) + _rect(20, 20, 30, 30) + _rect(60, 60, 90, 90))
+    topology = ContourTopology(segs)
+
+    assert sorted(c.depth for c in topology.closed) == [0, 1, 1, 2]
+    assert len(topology.outer) == 2 and len(topology.inner) == 2
+
+
+def test_scanline_ignores_open_contours():
+    doc = ezdxf.readfile(EXAMPLE)
+    topology = ContourTopology(ma.PlacementContext(doc).segs)
+    assert topology.open
+
+    sequence = ma.place_sequence(doc, 'BB', ma.comp_sf(doc, 50), None, align='c')
+    xs = [x + px for glyph, (px, _) in sequence.sequence for x, _ in glyph]
+    ys = [y + py for glyph, (_, py) in sequence.sequence for _, y in glyph]
+
+    assert topology.rect_is_clear(min(xs), min(ys), max(xs), max(ys))